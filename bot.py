@@ -10,13 +10,25 @@ from achallonge import ChallongeException
 # Custom modules
 from utils.json_hooks import dateconverter, dateparser, int_keys
 from utils.command_checks import tournament_is_pending, tournament_is_underway, tournament_is_underway_or_pending, in_channel, in_combat_channel, is_streaming, is_owner_or_to, inscriptions_still_open
-from utils.stream import is_on_stream, is_queued_for_stream
-from utils.rounds import is_top8, nom_round, is_bo5
+from utils.stream import is_on_stream, is_queued_for_stream, stream_manager
+from utils.rounds import is_top8, nom_round, is_bo5, round_info, build_round_table
 from utils.game_specs import get_access_stream
-from utils.http_retry import async_http_retry
+from utils.config_cache import get_gamelist, get_preferences, dump_preferences, gamelist_cache, preferences_cache
+from utils.http_retry import async_http_retry, get_retry_stats, read_cache
+from utils.http_session import get_session, close_session, use_shared_session
+from utils.rate_limit import challonge_limiter
 from utils.seeding import get_ranking_csv, seed_participants
 from utils.logging import init_loggers
-from utils.json_stream import participants, dump_participants
+from utils.score_queue import score_queue
+from utils.channel_pool import channel_pool, POOL_NAME, SIDES
+from utils.activity import activity
+from utils.set_channels import set_channels
+from utils.outbox import outbox
+from utils.annonce import annonce_updater
+from utils.registration import registrations
+from utils.polling import polling, OUT_OF_BAND_DELAY
+from utils.bracket import BracketSnapshot, BracketModel, MatchCompleted, MatchReopened, MatchUnmarked
+from utils.json_stream import participants, participants_index, dump_participants, compact_participants, commit_participant, reset_participants, get_tournoi, dump_tournoi
 
 # Import configuration (variables only)
 from utils.get_config import *
@@ -36,16 +48,33 @@ initial_extensions = ['cogs.dev_commands']
 
 
 ### Init things
-bot = commands.Bot(command_prefix=commands.when_mentioned_or(bot_prefix)) # Set prefix for commands
+class ATOS(commands.Bot):
+
+    async def close(self):
+        await outbox.flush() # DQ & stream notices still queued
+        log.info(f"Outbox : {outbox.stats()}")
+        sauver_checkpoint() # registration commands handled since the last snapshot
+        log.info(f"Challonge retries : {get_retry_stats()}")
+        log.info(f"Challonge reads (shared/cached) : {read_cache.stats()}")
+        log.info(f"Config files (cached/parsed) : gamelist {gamelist_cache.stats()}, preferences {preferences_cache.stats()}")
+        log.info(f"Challonge rate limit (per priority) : {challonge_limiter.stats()}")
+        await close_session() # shared HTTP connection pool
+        await super().close()
+
+bot = ATOS(command_prefix=commands.when_mentioned_or(bot_prefix)) # Set prefix for commands
 bot.remove_command('help') # Remove default help command to set our own
 achallonge.set_credentials(challonge_user, challonge_api_key)
+use_shared_session()
 scheduler = AsyncIOScheduler()
+bracket_snapshot = BracketSnapshot()
+bracket_model = BracketModel()
 
 
 #### Notifier de l'initialisation
 @bot.event
 async def on_ready():
     log.info("Bot successfully connected to Discord.")
+    get_session() # open the shared HTTP connection pool
     print(f"-------------------------------------")
     print(f"             A. T. O. S.             ")
     print(f"        Automated TO for Smash       ")
@@ -82,8 +111,8 @@ async def on_member_join(member):
 
 ### Récupérer informations du tournoi et initialiser tournoi.json
 async def init_tournament(url_or_id):
-    with open(preferences_path, 'r+') as f: preferences = yaml.full_load(f)
-    with open(gamelist_path, 'r+') as f: gamelist = yaml.full_load(f)
+    preferences = get_preferences()
+    gamelist = get_gamelist()
 
     try:
         infos = await async_http_retry(achallonge.tournaments.show, url_or_id)
@@ -132,9 +161,9 @@ async def init_tournament(url_or_id):
                                                       f"*Désactivez le bulk mode avec `{bot_prefix}set bulk_mode off` si vous ne souhaitez pas utiliser de ranking.*")
             return
 
-    with open(tournoi_path, 'w') as f: json.dump(tournoi, f, indent=4, default=dateconverter)
-    with open(participants_path, 'w') as f: json.dump({}, f, indent=4)
-    with open(stream_path, 'w') as f: json.dump({}, f, indent=4)
+    dump_tournoi(tournoi)
+    reset_participants()
+    stream_manager.reset()
 
     # Ensure permissions
     guild = bot.get_guild(id=guild_id)
@@ -150,7 +179,7 @@ async def init_tournament(url_or_id):
     scheduler.add_job(end_check_in, id='end_check_in', run_date=tournoi["fin_check-in"], replace_existing=True)
     scheduler.add_job(end_inscription, id='end_inscription', run_date=tournoi["fin_inscription"], replace_existing=True)
 
-    scheduler.add_job(dump_participants, 'interval', id='dump_participants', seconds=10, replace_existing=True)
+    scheduler.add_job(sauver_inscriptions, 'interval', id='sauver_inscriptions', minutes=5, replace_existing=True)
 
     await bot.change_presence(activity=discord.Game(tournoi['name']))
 
@@ -168,7 +197,7 @@ async def setup_tournament(ctx, arg):
         await ctx.message.add_reaction("🔗")
         return
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     try:
         tournoi["début_tournoi"]
@@ -181,9 +210,9 @@ async def setup_tournament(ctx, arg):
 ### AUTO-MODE : will take care of creating tournaments for you
 @scheduler.scheduled_job('interval', id='auto_setup_tournament', hours=1)
 async def auto_setup_tournament():
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
     with open(auto_mode_path, 'r+') as f: tournaments = yaml.full_load(f)
-    with open(preferences_path, 'r+') as f: preferences = yaml.full_load(f)
+    preferences = get_preferences()
 
     #  Auto-mode won't run if at least one of these conditions is met :
     #    - It's turned off in preferences.yml
@@ -228,7 +257,7 @@ async def auto_setup_tournament():
                 await init_tournament(new_tournament["id"])
 
                 # Check if the tournamet was configured
-                with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+                tournoi = get_tournoi()
                 if tournoi != {}:
                     tournaments[tournament]["edition"] += 1
                     with open(auto_mode_path, 'w') as f: yaml.dump(tournaments, f)
@@ -241,7 +270,7 @@ async def auto_setup_tournament():
 @commands.check(is_owner_or_to)
 @commands.check(tournament_is_pending)
 async def start_tournament(ctx):
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     guild = bot.get_guild(id=guild_id)
     challenger = guild.get_role(challenger_id)
@@ -249,16 +278,18 @@ async def start_tournament(ctx):
     if datetime.datetime.now() > tournoi["fin_inscription"]:
         await async_http_retry(achallonge.tournaments.start, tournoi["id"])
         tournoi["statut"] = "underway"
-        with open(tournoi_path, 'w') as f: json.dump(tournoi, f, indent=4, default=dateconverter)
+        dump_tournoi(tournoi)
         await ctx.message.add_reaction("✅")
     else:
         await ctx.message.add_reaction("🕐")
         return
 
+    bracket_model.clear() # built again from the started bracket
     await calculate_top8()
+    await fill_channel_pool()
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser) # Refresh to get top 8
-    with open(gamelist_path, 'r+') as f: gamelist = yaml.full_load(f)
+    tournoi = get_tournoi() # Refresh to get top 8
+    gamelist = get_gamelist()
 
     await bot.get_channel(annonce_channel_id).send(f"{server_logo} Le tournoi **{tournoi['name']}** est officiellement lancé ! Voici le bracket : {tournoi['url']}\n"
                                                    f":white_small_square: Vous pouvez y accéder à tout moment avec la commande `{bot_prefix}bracket`.\n"
@@ -285,14 +316,14 @@ async def start_tournament(ctx):
 
     tournoi_annonce = (f":alarm_clock: <@&{challenger_id}> On arrête le freeplay ! Le tournoi est sur le point de commencer. Veuillez lire les consignes :\n"
                        f":white_small_square: Vos sets sont annoncés dès que disponibles dans <#{queue_channel_id}> : **ne lancez rien sans consulter ce channel**.\n"
-                       f":white_small_square: Le ruleset ainsi que les informations pour le bannissement des stages sont dispo dans <#{gamelist[tournoi['game']]['ruleset']}>.\n"
+                       f":white_small_square: Le ruleset ainsi que les informations pour le bannissement des stages sont dispo dans <#{gamelist[tournoi['game']].ruleset}>.\n"
                        f":white_small_square: Le gagnant d'un set doit rapporter le score **dès que possible** dans <#{scores_channel_id}> avec la commande `{bot_prefix}win`.\n"
                        f":white_small_square: Vous pouvez DQ du tournoi avec la commande `{bot_prefix}dq`, ou juste abandonner votre set en cours avec `{bot_prefix}ff`.\n"
                        f":white_small_square: En cas de lag qui rend votre set injouable, utilisez la commande `{bot_prefix}lag` pour résoudre la situation.\n"
                        f":timer: Vous serez **DQ automatiquement** si vous n'avez pas été actif sur votre channel __dans les {tournoi['check_channel_presence']} minutes qui suivent sa création__.")
 
     if tournoi["game"] == "Project+":
-        tournoi_annonce += f"\n{gamelist[tournoi['game']]['icon']} En cas de desync, utilisez la commande `{bot_prefix}desync` pour résoudre la situation."
+        tournoi_annonce += f"\n{gamelist[tournoi['game']].icon} En cas de desync, utilisez la commande `{bot_prefix}desync` pour résoudre la situation."
 
     tournoi_annonce += (f"\n\n:fire: Le **top 8** commencera, d'après le bracket :\n"
                         f":white_small_square: En **{nom_round(tournoi['round_winner_top8'])}**\n"
@@ -313,7 +344,7 @@ async def start_tournament(ctx):
 
     await bot.get_channel(tournoi_channel_id).send(tournoi_annonce)
 
-    scheduler.add_job(underway_tournament, 'interval', id='underway_tournament', minutes=1, start_date=tournoi["début_tournoi"], replace_existing=True)
+    scheduler.add_job(underway_tournament, 'interval', id='underway_tournament', seconds=poll_normal, start_date=tournoi["début_tournoi"], replace_existing=True)
 
 
 ### Terminer un tournoi
@@ -321,7 +352,7 @@ async def start_tournament(ctx):
 @commands.check(is_owner_or_to)
 @commands.check(tournament_is_underway)
 async def end_tournament(ctx):
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     if datetime.datetime.now() > tournoi["début_tournoi"]:
         await async_http_retry(achallonge.tournaments.finalize, tournoi["id"])
@@ -335,6 +366,17 @@ async def end_tournament(ctx):
         scheduler.remove_job('underway_tournament')
     except JobLookupError:
         pass
+
+    await outbox.flush() # last notices, before their channels are deleted
+
+    bracket_snapshot.clear()
+    bracket_model.clear()
+    channels_to_clean.clear()
+    sets_bloques.clear()
+    polling.clear()
+    score_queue.clear()
+    annonce_updater.clear()
+    registrations.clear()
     
     # Annoucements (including results)
     await annonce_resultats()
@@ -342,13 +384,10 @@ async def end_tournament(ctx):
         f"{server_logo} Le tournoi **{tournoi['name']}** est terminé, merci à toutes et à tous d'avoir participé ! "
         f"J'espère vous revoir bientôt.")
 
-    # Reset participants
-    participants.clear()
-
-    # Reset JSON storage
-    with open(participants_path, 'w') as f: json.dump({}, f, indent=4)
-    with open(tournoi_path, 'w') as f: json.dump({}, f, indent=4)
-    with open(stream_path, 'w') as f: json.dump({}, f, indent=4)
+    # Reset storage
+    reset_participants()
+    dump_tournoi({})
+    stream_manager.reset()
 
     # Remove now obsolete files
     for file in list(Path(Path(ranking_path).parent).rglob('*.csv_*')):
@@ -366,7 +405,7 @@ async def end_tournament(ctx):
 
 ### S'execute à chaque lancement, permet de relancer les tâches en cas de crash
 async def reload_tournament():
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     try:
         await bot.change_presence(activity=discord.Game(tournoi['name']))
@@ -376,13 +415,14 @@ async def reload_tournament():
 
     # Relancer les tâches automatiques
     if tournoi["statut"] == "underway":
-        scheduler.add_job(underway_tournament, 'interval', id='underway_tournament', minutes=1, replace_existing=True)
+        set_channels.load(bot.get_guild(id=guild_id)) # channels of the sets launched before the restart
+        scheduler.add_job(underway_tournament, 'interval', id='underway_tournament', seconds=poll_normal, replace_existing=True)
 
     elif datetime.datetime.now() < tournoi["fin_inscription"]:
         scheduler.add_job(start_check_in, id='start_check_in', run_date=tournoi["début_check-in"], replace_existing=True)
         scheduler.add_job(end_check_in, id='end_check_in', run_date=tournoi["fin_check-in"], replace_existing=True)
         scheduler.add_job(end_inscription, id='end_inscription', run_date=tournoi["fin_inscription"], replace_existing=True)
-        scheduler.add_job(dump_participants, 'interval', id='dump_participants', seconds=10, replace_existing=True)
+        scheduler.add_job(sauver_inscriptions, 'interval', id='sauver_inscriptions', minutes=5, replace_existing=True)
 
         if tournoi["début_check-in"] < datetime.datetime.now() < tournoi["fin_check-in"]:
             scheduler.add_job(rappel_check_in, 'interval', id='rappel_check_in', minutes=10, replace_existing=True)
@@ -393,65 +433,42 @@ async def reload_tournament():
     if datetime.datetime.now() < tournoi["fin_inscription"]:
         
         if tournoi["reaction_mode"]:
-            annonce = await bot.get_channel(inscriptions_channel_id).fetch_message(tournoi["annonce_id"])
-
-            # Avoir une liste des users ayant réagi
-            for reaction in annonce.reactions:
-                if str(reaction.emoji) == "✅":
-                    reactors = await reaction.users().flatten()
-                    break
-
-            # Inscrire ceux qui ne sont pas dans les participants
-            id_list = []
-
-            for reactor in reactors:
-                if reactor.id != bot.user.id:
-                    id_list.append(reactor.id)  # Récupérer une liste des IDs pour plus tard
-
-                    if reactor.id not in participants:
-                        await inscrire(reactor)
-
-            # Désinscrire ceux qui ne sont plus dans la liste des users ayant réagi
-            for inscrit in participants:
-                if inscrit not in id_list:
-                    await desinscrire(annonce.guild.get_member(inscrit))
+            annonce = await annonce_updater.get(bot.get_channel(inscriptions_channel_id), tournoi["annonce_id"])
+            await reconcilier_reactions(annonce)
         
         else:
-            async for message in bot.get_channel(inscriptions_channel_id).history(oldest_first=True):
-                if message.author == bot.user or message.reactions != []:
-                    continue
-
-                if not any([bot.user in await reaction.users().flatten() for reaction in message.reactions]):
-                    await bot.process_commands(message)
+            await rejouer_inscriptions()
 
         log.info("Missed inscriptions were also taken care of.")
 
 
 ### Annonce l'inscription
 async def annonce_inscription():
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
-    with open(gamelist_path, 'r+') as f: gamelist = yaml.full_load(f)
+    tournoi = get_tournoi()
+    gamelist = get_gamelist()
 
     annonce = (
-        f"{server_logo} **{tournoi['name']}** - {gamelist[tournoi['game']]['icon']} *{tournoi['game']}*\n"
+        f"{server_logo} **{tournoi['name']}** - {gamelist[tournoi['game']].icon} *{tournoi['game']}*\n"
         f":white_small_square: __Date__ : {format_date(tournoi['début_tournoi'], format='full', locale=language)} à {format_time(tournoi['début_tournoi'], format='short', locale=language)}\n"
         f":white_small_square: __Check-in__ : de {format_time(tournoi['début_check-in'], format='short', locale=language)} à {format_time(tournoi['fin_check-in'], format='short', locale=language)} "
         f"(fermeture des inscriptions à {format_time(tournoi['fin_inscription'], format='short', locale=language)})\n"
         f":white_small_square: __Limite__ : 0/{str(tournoi['limite'])} joueurs *(mise à jour en temps réel)*\n"
         f":white_small_square: __Bracket__ : {tournoi['url'] if not tournoi['bulk_mode'] else 'disponible peu de temps avant le début du tournoi'}\n"
-        f":white_small_square: __Format__ : singles, double élimination (ruleset : <#{gamelist[tournoi['game']]['ruleset']}>)\n\n"
+        f":white_small_square: __Format__ : singles, double élimination (ruleset : <#{gamelist[tournoi['game']].ruleset}>)\n\n"
         f"Vous pouvez vous inscrire/désinscrire {'en ajoutant/retirant la réaction ✅ à ce message' if tournoi['reaction_mode'] else f'avec les commandes `{bot_prefix}in`/`{bot_prefix}out`'}.\n"
         f"*Note : votre **pseudonyme {'sur ce serveur' if tournoi['use_guild_name'] else 'Discord général'}** au moment de l'inscription sera celui utilisé dans le bracket.*"
     )
     
     inscriptions_channel = bot.get_channel(inscriptions_channel_id)
-    inscriptions_role = inscriptions_channel.guild.get_role(gamelist[tournoi['game']]['role']) if tournoi["restrict_to_role"] else inscriptions_channel.guild.default_role
+    inscriptions_role = inscriptions_channel.guild.get_role(gamelist[tournoi['game']].role) if tournoi["restrict_to_role"] else inscriptions_channel.guild.default_role
 
     await inscriptions_channel.purge(limit=None)
 
     annonce_msg = await inscriptions_channel.send(annonce)
+    annonce_updater.cache(annonce_msg)
+    registrations.clear() # open to the reactions of this tournament
     tournoi['annonce_id'] = annonce_msg.id
-    with open(tournoi_path, 'w') as f: json.dump(tournoi, f, indent=4, default=dateconverter)
+    dump_tournoi(tournoi)
 
     if tournoi['reaction_mode']:
         await annonce_msg.add_reaction("✅")
@@ -464,23 +481,78 @@ async def annonce_inscription():
         await inscriptions_channel.set_permissions(inscriptions_role, read_messages=True, send_messages=True, add_reactions=False)
         await inscriptions_channel.edit(slowmode_delay=60)
 
-    await bot.get_channel(annonce_channel_id).send(f"{server_logo} Inscriptions pour le **{tournoi['name']}** ouvertes dans <#{inscriptions_channel_id}> ! Consultez-y les messages épinglés. <@&{gamelist[tournoi['game']]['role']}>\n"
+    await bot.get_channel(annonce_channel_id).send(f"{server_logo} Inscriptions pour le **{tournoi['name']}** ouvertes dans <#{inscriptions_channel_id}> ! Consultez-y les messages épinglés. <@&{gamelist[tournoi['game']].role}>\n"
                                                    f":calendar_spiral: Ce tournoi aura lieu le **{format_date(tournoi['début_tournoi'], format='full', locale=language)} à {format_time(tournoi['début_tournoi'], format='short', locale=language)}**.")
 
 
 ### Inscription
 async def inscrire(member):
+    await inscrire_membres([member])
+
+async def inscrire_membres(members, quand=None):
+
+    tournoi = get_tournoi()
+    quand = quand or datetime.datetime.now() # when it was asked
+
+    admis = []
+
+    for member in members:
+
+        if (member.id not in participants) and (len(participants) < tournoi['limite']):
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+            participants[member.id] = {
+                "display_name": member.display_name if tournoi['use_guild_name'] else str(member),
+                "checked_in": datetime.datetime.now() > tournoi["début_check-in"]
+            }
+            admis.append(member)
 
-    if (member.id not in participants) and (len(participants) < tournoi['limite']):
+        elif tournoi["reaction_mode"] and len(participants) >= tournoi['limite']:
+            registrations.background(refuser_inscription(member))
 
-        participants[member.id] = {
-            "display_name": member.display_name if tournoi['use_guild_name'] else str(member),
-            "checked_in": datetime.datetime.now() > tournoi["début_check-in"]
-        }
+    if tournoi["bulk_mode"] == False or quand > tournoi["fin_inscription"]:
+        admis = await creer_participants(admis)
 
-        if tournoi["bulk_mode"] == False or datetime.datetime.now() > tournoi["fin_inscription"]:
+    for member in admis:
+        await commit_participant("in", member.id)
+        participants_index.add(member.id)
+        registrations.background(accueillir_participant(member))
+
+    if admis: await update_annonce()
+
+
+### Créer les participants sur Challonge, par groupes de 50 (to avoid "414 Request-URI Too Large")
+async def creer_participants(members):
+
+    tournoi = get_tournoi()
+
+    crees = []
+
+    for chunk in [members[x:x+50] for x in range(0, len(members), 50)]:
+
+        try:
+            challonge_participants = await async_http_retry(
+                achallonge.participants.bulk_add,
+                tournoi["id"],
+                [participants[member.id]["display_name"] for member in chunk]
+            )
+        except ChallongeException: # e.g. a name refused by Challonge : one by one instead
+            challonge_participants = []
+
+        if len(challonge_participants) == len(chunk):
+            for member, inscrit in zip(chunk, challonge_participants): # same order as the names sent
+                participants[member.id]["challonge"] = inscrit["id"]
+                crees.append(member)
+            continue
+
+        # Those already added before Challonge refused the chunk are picked up, not created twice
+        assignes = {participants[inscrit].get("challonge") for inscrit in participants}
+        existants = {inscrit["name"]: inscrit["id"] for inscrit in await async_http_retry(achallonge.participants.index, tournoi["id"]) if inscrit["id"] not in assignes}
+
+        for member in chunk:
+            if participants[member.id]["display_name"] in existants:
+                participants[member.id]["challonge"] = existants.pop(participants[member.id]["display_name"])
+                crees.append(member)
+                continue
             try:
                 participants[member.id]["challonge"] = (
                     await async_http_retry(
@@ -491,84 +563,209 @@ async def inscrire(member):
                 )['id']
             except ChallongeException:
                 del participants[member.id]
-                return
+            else:
+                crees.append(member)
 
-        await member.add_roles(member.guild.get_role(challenger_id))
+    return crees
 
-        await update_annonce()
 
-        try:
-            msg = f"Tu t'es inscrit(e) avec succès pour le tournoi **{tournoi['name']}**."
-            if datetime.datetime.now() > tournoi["début_check-in"]:
-                msg += " Tu n'as **pas besoin de check-in** comme le tournoi commence bientôt !"
-            await member.send(msg)
-        except discord.Forbidden:
-            pass
+async def accueillir_participant(member):
 
-    elif tournoi["reaction_mode"] and len(participants) >= tournoi['limite']:
+    tournoi = get_tournoi()
 
-        try:
-            await member.send(f"Il n'y a malheureusement plus de place pour le tournoi **{tournoi['name']}**. "
-                              f"Retente ta chance plus tard, par exemple à la fin du check-in pour remplacer les absents !")
-        except discord.Forbidden:
-            pass
+    await member.add_roles(member.guild.get_role(challenger_id))
 
-        try:
-            inscription = await bot.get_channel(inscriptions_channel_id).fetch_message(tournoi["annonce_id"])
-            await inscription.remove_reaction("✅", member)
-        except (discord.HTTPException, discord.NotFound):
-            pass
+    try:
+        msg = f"Tu t'es inscrit(e) avec succès pour le tournoi **{tournoi['name']}**."
+        if datetime.datetime.now() > tournoi["début_check-in"]:
+            msg += " Tu n'as **pas besoin de check-in** comme le tournoi commence bientôt !"
+        await member.send(msg)
+    except discord.Forbidden:
+        pass
+
+
+async def refuser_inscription(member):
+
+    tournoi = get_tournoi()
+
+    try:
+        await member.send(f"Il n'y a malheureusement plus de place pour le tournoi **{tournoi['name']}**. "
+                          f"Retente ta chance plus tard, par exemple à la fin du check-in pour remplacer les absents !")
+    except discord.Forbidden:
+        pass
+
+    try:
+        inscription = await annonce_updater.get(bot.get_channel(inscriptions_channel_id), tournoi["annonce_id"])
+        await inscription.remove_reaction("✅", member)
+    except (discord.HTTPException, discord.NotFound):
+        pass
+
+
+### Au redémarrage, rejouer les commandes manquées depuis le dernier message traité
+checkpoint_inscriptions = {"replay": False, "dernier": None} # last handled command, not saved yet
+
+async def rejouer_inscriptions():
+
+    tournoi = get_tournoi()
+    checkpoint = tournoi.get("inscriptions_checkpoint", tournoi["annonce_id"]) # the announcement is the first message of the channel
+
+    manques, dernier = [], checkpoint
+
+    # Live commands must not move the checkpoint past messages not replayed yet
+    checkpoint_inscriptions["replay"] = True
+
+    try:
+        async for message in bot.get_channel(inscriptions_channel_id).history(limit=None, after=discord.Object(id=checkpoint), oldest_first=True):
+            dernier = message.id
+            if message.author != bot.user and message.reactions == []: # commands already handled have a reaction from the bot
+                manques.append(message)
+
+        log.info(f"Registration commands since the restart : {len(manques)} to replay")
+
+        for message in manques: # one after the other, in the order they were sent
+            await bot.process_commands(message)
+
+    finally:
+        checkpoint_inscriptions["replay"] = False
+
+    avancer_checkpoint(dernier)
+    sauver_checkpoint()
+
+def avancer_checkpoint(message_id):
+    if checkpoint_inscriptions["replay"]: return
+    if checkpoint_inscriptions["dernier"] == None or message_id > checkpoint_inscriptions["dernier"]:
+        checkpoint_inscriptions["dernier"] = message_id
+
+### Written with the participants snapshot : lagging behind only means reading a few more messages again, the replay skips those already handled
+def sauver_checkpoint():
+    dernier, checkpoint_inscriptions["dernier"] = checkpoint_inscriptions["dernier"], None
+    tournoi = get_tournoi()
+    if dernier != None and "annonce_id" in tournoi and dernier > tournoi.get("inscriptions_checkpoint", tournoi["annonce_id"]):
+        tournoi["inscriptions_checkpoint"] = dernier
+        dump_tournoi(tournoi)
+
+def sauver_inscriptions():
+    compact_participants()
+    sauver_checkpoint()
+
+
+### Au redémarrage, rattraper les réactions manquées
+async def reconcilier_reactions(annonce):
+
+    reactors = set()
+
+    # Les users ayant réagi, lus page par page
+    for reaction in annonce.reactions:
+        if str(reaction.emoji) == "✅":
+            async for reactor in reaction.users():
+                if reactor.id != bot.user.id: reactors.add(reactor.id)
+            break
+
+    inscrits = set(participants)
+    ajouts = [member for member in map(annonce.guild.get_member, sorted(reactors - inscrits)) if member != None]
+    retraits = list(inscrits - reactors) # ids : some of them may have left the server
+
+    log.info(f"Reactions since the restart : {len(ajouts)} to register, {len(retraits)} to unregister")
+
+    semaphore = asyncio.Semaphore(registration_workers)
+    progression = {"in": 0, "out": 0}
+
+    async def retirer(discord_id):
+        async with semaphore:
+            await desinscrire_id(discord_id, annonce.guild.get_member(discord_id))
+            progression["out"] += 1
+
+    async def ajouter(lot):
+        async with semaphore:
+            await inscrire_membres(lot) # one bulk_add per batch
+            progression["in"] += len(lot)
+            log.info(f"Reactions since the restart : {progression['in']}/{len(ajouts)} registered, {progression['out']}/{len(retraits)} unregistered")
+
+    # Removals first, they free slots for the others
+    await asyncio.gather(*[retirer(discord_id) for discord_id in retraits])
+    await asyncio.gather(*[ajouter(ajouts[x:x+50]) for x in range(0, len(ajouts), 50)])
+
+
+### Inscriptions et désinscriptions par réaction, appliquées par lots
+async def appliquer_reactions(batch):
+    tournoi = get_tournoi()
+
+    # Judged on the time of the reaction : the last batch runs after the end of the registrations
+    ajouts = [(member, quand) for member, op, quand in batch if op == "in" and quand < tournoi["fin_inscription"]]
+    if ajouts:
+        await inscrire_membres([member for member, quand in ajouts], max(quand for member, quand in ajouts))
+
+    for member, op, quand in batch:
+        if op == "out": await desinscrire(member, quand)
 
 
 ### Désinscription
-async def desinscrire(member):
+async def desinscrire(member, quand=None):
+    await desinscrire_id(member.id, member, quand)
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
 
-    if member.id in participants:
+### Member is None when they left the server : only Challonge and the participants are updated
+async def desinscrire_id(discord_id, member=None, quand=None):
 
-        if tournoi["bulk_mode"] == False or datetime.datetime.now() > tournoi["fin_inscription"]:
-            await async_http_retry(achallonge.participants.destroy, tournoi['id'], participants[member.id]['challonge'])
+    tournoi = get_tournoi()
+    quand = quand or datetime.datetime.now() # when it was asked
 
-        try:
-            await member.remove_roles(member.guild.get_role(challenger_id))
-        except discord.HTTPException:
-            pass
+    if discord_id in participants:
 
-        if datetime.datetime.now() < tournoi["fin_inscription"]:
+        if tournoi["bulk_mode"] == False or quand > tournoi["fin_inscription"]:
+            await async_http_retry(achallonge.participants.destroy, tournoi['id'], participants[discord_id]['challonge'])
 
-            del participants[member.id]
+        if member != None:
+            registrations.background(member.remove_roles(member.guild.get_role(challenger_id)))
 
-            if tournoi['reaction_mode']:
-                try:
-                    inscription = await bot.get_channel(inscriptions_channel_id).fetch_message(tournoi["annonce_id"])
-                    await inscription.remove_reaction("✅", member)
-                except (discord.HTTPException, discord.NotFound):
-                    pass
+        if quand < tournoi["fin_inscription"]:
+
+            participants_index.remove(discord_id)
+            del participants[discord_id]
+            await commit_participant("out", discord_id)
+
+            if member != None:
+                registrations.background(prevenir_desinscription(member))
 
             await update_annonce()
 
-            try:
-                await member.send(f"Tu es désinscrit(e) du tournoi **{tournoi['name']}**. À une prochaine fois peut-être !")
-            except discord.Forbidden:
-                pass
+
+async def prevenir_desinscription(member):
+
+    tournoi = get_tournoi()
+
+    if tournoi['reaction_mode']:
+        try:
+            inscription = await annonce_updater.get(bot.get_channel(inscriptions_channel_id), tournoi["annonce_id"])
+            await inscription.remove_reaction("✅", member)
+        except (discord.HTTPException, discord.NotFound):
+            pass
+
+    try:
+        await member.send(f"Tu es désinscrit(e) du tournoi **{tournoi['name']}**. À une prochaine fois peut-être !")
+    except discord.Forbidden:
+        pass
 
 
 ### Mettre à jour l'annonce d'inscription
 async def update_annonce():
+    annonce_updater.schedule(edit_annonce) # coalesced : at most one edit every few seconds, with the latest count
+
+async def edit_annonce():
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
-    old_annonce = await bot.get_channel(inscriptions_channel_id).fetch_message(tournoi["annonce_id"])
-    new_annonce = re.sub(r'[0-9]{1,3}\/', str(len(participants)) + '/', old_annonce.content)
-    await old_annonce.edit(content=new_annonce)
+    annonce = await annonce_updater.get(bot.get_channel(inscriptions_channel_id), tournoi["annonce_id"])
+    new_annonce = re.sub(r'[0-9]{1,3}\/', str(len(participants)) + '/', annonce.content)
+    if new_annonce != annonce.content:
+        await annonce.edit(content=new_annonce)
 
 
 ### Début du check-in
 async def start_check_in():
 
     guild = bot.get_guild(id=guild_id)
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     challenger = guild.get_role(challenger_id)
 
@@ -589,7 +786,7 @@ async def start_check_in():
 ### Rappel de check-in
 async def rappel_check_in():
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     guild = bot.get_guild(id=guild_id)
 
@@ -608,17 +805,13 @@ async def rappel_check_in():
 
     if rappel_msg == "": return
 
-    await bot.get_channel(check_in_channel_id).send(":clock1: **Rappel de check-in !**")
-
-    if len(rappel_msg) < 2000:
-        await bot.get_channel(check_in_channel_id).send(rappel_msg)
-    else: # Discord doesn't deal with more than 2000 characters
-        rappel_msg = [x.strip() for x in rappel_msg.split('\n') if x.strip() != ''] # so we have to split
-        while rappel_msg:
-            await bot.get_channel(check_in_channel_id).send('\n'.join(rappel_msg[:50]))
-            del rappel_msg[:50] # and send by groups of 50 people
+    check_in_channel = bot.get_channel(check_in_channel_id)
 
-    await bot.get_channel(check_in_channel_id).send(f"*Vous avez jusqu'à {format_time(tournoi['fin_check-in'], format='short', locale=language)}, sinon vous serez désinscrit(s) automatiquement.*")
+    # One call : merged and split in pages of less than 2000 characters by the outbox
+    outbox.send(check_in_channel,
+                ":clock1: **Rappel de check-in !**",
+                rappel_msg,
+                f"*Vous avez jusqu'à {format_time(tournoi['fin_check-in'], format='short', locale=language)}, sinon vous serez désinscrit(s) automatiquement.*")
 
 
 ### Fin du check-in
@@ -649,15 +842,19 @@ async def end_check_in():
 
 ### Fin des inscriptions
 async def end_inscription():
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
-    with open(gamelist_path, 'r+') as f: gamelist = yaml.full_load(f)
+    tournoi = get_tournoi()
+    gamelist = get_gamelist()
+
+    registrations.close() # reactions from now on are ignored
+    await registrations.flush() # last ones received before closing
+    await annonce_updater.flush() # last player count
 
     if tournoi["reaction_mode"]:
-        annonce = await bot.get_channel(inscriptions_channel_id).fetch_message(tournoi["annonce_id"])
+        annonce = await annonce_updater.get(bot.get_channel(inscriptions_channel_id), tournoi["annonce_id"])
         await annonce.clear_reaction("✅")
     else:
         guild = bot.get_guild(id=guild_id)
-        inscriptions_role = guild.get_role(gamelist[tournoi['game']]['role']) if tournoi["restrict_to_role"] else guild.default_role
+        inscriptions_role = guild.get_role(gamelist[tournoi['game']].role) if tournoi["restrict_to_role"] else guild.default_role
         await bot.get_channel(inscriptions_channel_id).set_permissions(inscriptions_role, read_messages=True, send_messages=False, add_reactions=False)
 
     await bot.get_channel(inscriptions_channel_id).send(":clock1: **Les inscriptions sont fermées :** le bracket est désormais en cours de finalisation.")
@@ -666,15 +863,17 @@ async def end_inscription():
         await seed_participants(participants)
 
     try:
-        scheduler.remove_job('dump_participants')
+        scheduler.remove_job('sauver_inscriptions')
     except JobLookupError:
         pass
     finally:
         dump_participants()
+        sauver_checkpoint()
 
 
 async def check_in(member):
     participants[member.id]["checked_in"] = True
+    await commit_participant("check_in", member.id)
     try:
         await member.send("Tu as été check-in avec succès. Tu n'as plus qu'à patienter jusqu'au début du tournoi !")
     except discord.Forbidden:
@@ -687,7 +886,7 @@ async def check_in(member):
 @commands.max_concurrency(1, wait=True)
 async def participants_management(ctx):
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     if ctx.invoked_with == 'out':
 
@@ -711,6 +910,9 @@ async def participants_management(ctx):
         else:
             await ctx.message.add_reaction("🚫")
 
+    if ctx.channel.id == inscriptions_channel_id:
+        avancer_checkpoint(ctx.message.id) # not replayed after a restart
+
 
 ### Nettoyer les channels liés aux tournois
 async def purge_channels():
@@ -729,6 +931,10 @@ async def purge_categories():
         for channel in category.channels: await channel.delete() # first, delete the channels
         await category.delete() # then delete the category
 
+    channel_pool.clear()
+    set_channels.clear()
+    activity.clear()
+
 
 ### Nettoyer les rôles liés aux tournois
 async def purge_roles():
@@ -746,7 +952,7 @@ async def purge_roles():
 @bot.command(name='bracket')
 @commands.check(tournament_is_underway_or_pending)
 async def post_bracket(ctx):
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
     await ctx.send(f"{server_logo} **{tournoi['name']}** : {tournoi['url']}")
 
 
@@ -761,8 +967,7 @@ async def flipcoin(ctx):
 @commands.check(is_owner_or_to)
 @commands.check(inscriptions_still_open)
 async def add_inscrit(ctx):
-    for member in ctx.message.mentions:
-        await inscrire(member)
+    await inscrire_membres(ctx.message.mentions)
     await ctx.message.add_reaction("✅")
 
 
@@ -788,15 +993,106 @@ async def self_dq(ctx):
 
 
 ### Managing sets during tournament : launch & remind
-### Goal : get the bracket only once to limit API calls
+### Goal : get the bracket only once to limit API calls, then only act on what changed
 async def underway_tournament():
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
-    guild = bot.get_guild(id=guild_id)
-    bracket = await async_http_retry(achallonge.matches.index, tournoi["id"], state='open')
-    await launch_matches(guild, bracket)
-    await call_stream(guild, bracket)
-    await rappel_matches(guild, bracket)
-    await clean_channels(guild, bracket)
+    if polling.running: # an out-of-band poll can't run alongside the regular one
+        polling.pending = True
+        return
+
+    polling.running = True
+    try:
+        tournoi = get_tournoi()
+        guild = bot.get_guild(id=guild_id)
+        bracket = await async_http_retry(achallonge.matches.index, tournoi["id"], state='open')
+        events = bracket_snapshot.update(bracket)
+        if bracket_model.matches and bracket_model.reconcile(bracket):
+            # Changed outside of the bot : take Challonge's state instead of guessing it
+            bracket_model.build(await async_http_retry(achallonge.matches.index, tournoi["id"]))
+        await release_unmarked(guild, events)
+        backlog = len(bracket_snapshot.waiting) > launch_per_tick
+        await launch_matches(guild, sorted(bracket_snapshot.waiting.values(), key=lambda match: match["suggested_play_order"]))
+        await call_stream(guild)
+        await rappel_matches(guild, list(bracket_snapshot.underway.values()))
+        await clean_channels(guild, events)
+    finally:
+        polling.running = False
+
+    # Poll faster when things are moving, slower when nothing happens
+    interval = polling.interval
+    if polling.next_interval(events, backlog) != interval:
+        scheduler.reschedule_job('underway_tournament', trigger='interval', seconds=polling.interval)
+
+    if polling.pending:
+        polling.pending = False
+        poll_soon()
+
+### Local bracket model, built again from Challonge when missing (e.g. after a restart)
+async def get_bracket_model():
+    if not bracket_model.matches:
+        tournoi = get_tournoi()
+        bracket_model.build(await async_http_retry(achallonge.matches.index, tournoi['id']))
+    return bracket_model
+
+### Poll the bracket without waiting for the next tick (after a score report)
+def poll_soon(delay=OUT_OF_BAND_DELAY):
+    if polling.running:
+        polling.pending = True
+        return
+
+    try:
+        scheduler.modify_job('underway_tournament', next_run_time=datetime.datetime.now() + datetime.timedelta(seconds=delay))
+    except JobLookupError:
+        pass
+
+
+### Score reports : acknowledged right away, processed by the score queue
+async def queue_score_report(ctx, report):
+    await ctx.message.add_reaction("⏳")
+
+    async def process():
+        try:
+            await with_match_lock(ctx, report)
+        finally:
+            try:
+                await ctx.message.remove_reaction("⏳", bot.user)
+            except discord.HTTPException:
+                pass
+
+    async def on_error():
+        await ctx.message.add_reaction("⚠️")
+
+    score_queue.submit(process(), on_error)
+
+### Reports of the same set are processed one at a time
+async def with_match_lock(ctx, report):
+    tournoi = get_tournoi()
+
+    # Open set of the player : None if Challonge couldn't be reached, [] if there is none
+    async def open_match():
+        try:
+            return await async_http_retry(
+                achallonge.matches.index,
+                tournoi['id'],
+                state='open',
+                participant_id=participants[ctx.author.id]["challonge"]
+            )
+        except ChallongeException:
+            return None
+
+    match = await open_match()
+
+    if not match: # the report itself tells the player what's wrong
+        await report(match)
+        return
+
+    lock = score_queue.lock(match[0]["id"])
+    waited = lock.locked()
+
+    async with lock:
+        if waited: # the set may have been reported while waiting for the lock
+            match_id, match = match[0]["id"], await open_match()
+            if match != None: match = [x for x in match if x["id"] == match_id]
+        await report(match)
 
 
 ### Gestion des scores
@@ -805,21 +1101,16 @@ async def underway_tournament():
 @commands.check(tournament_is_underway)
 @commands.has_role(challenger_id)
 @commands.cooldown(1, 30, type=commands.BucketType.user)
-@commands.max_concurrency(1, wait=True)
 async def score_match(ctx, arg):
+    await queue_score_report(ctx, lambda match: report_score(ctx, arg, match))
+
+async def report_score(ctx, arg, match):
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     winner = participants[ctx.author.id]["challonge"] # Le gagnant est celui qui poste
 
-    try:
-        match = await async_http_retry(
-            achallonge.matches.index,
-            tournoi['id'],
-            state='open',
-            participant_id=winner
-        )
-    except ChallongeException:
+    if match == None: # read by with_match_lock
         await ctx.message.add_reaction("🕐")
         await ctx.send(f"<@{ctx.author.id}> Dû à une coupure de Challonge, je n'ai pas pu récupérer les données du set. Merci de retenter dans quelques instants.")
         return
@@ -860,14 +1151,9 @@ async def score_match(ctx, arg):
         await ctx.send(f"<@{ctx.author.id}> **Temps écoulé trop court** pour qu'un résultat soit déjà rentré pour le set.")
         return
 
-    for joueur in participants:
-        if participants[joueur]["challonge"] == match[0]["player2_id"]:
-            player2 = joueur
-            break
-
     og_score = score
 
-    if winner == participants[player2]["challonge"]:
+    if winner == match[0]["player2_id"]:
         score = score[::-1] # Le score doit suivre le format "player1-player2" pour scores_csv
 
     try:
@@ -878,6 +1164,9 @@ async def score_match(ctx, arg):
             scores_csv=score,
             winner_id=winner
         )
+        bracket_model.report(match[0]['id'], winner)
+        polling.report()
+        poll_soon()
         await ctx.message.add_reaction("✅")
 
     except ChallongeException:
@@ -885,7 +1174,7 @@ async def score_match(ctx, arg):
         await ctx.send(f"<@{ctx.author.id}> Dû à une coupure de Challonge, je n'ai pas pu envoyer ton score. Merci de retenter dans quelques instants.")
 
     else:
-        gaming_channel = discord.utils.get(ctx.guild.text_channels, name=str(match[0]["suggested_play_order"]))
+        gaming_channel = set_channels.get(ctx.guild, match[0]["suggested_play_order"])
 
         if gaming_channel != None:
             await gaming_channel.send(f":bell: __Score rapporté__ : **{participants[ctx.author.id]['display_name']}** gagne **{og_score}** !\n"
@@ -894,24 +1183,98 @@ async def score_match(ctx, arg):
 
 
 ### Clean channels
-async def clean_channels(guild, bracket):
-
-    play_orders = [match['suggested_play_order'] for match in bracket]
-
-    for category, channels in guild.by_category():
-        # Category must be a tournament category
-        if category != None and category.name.lower() in ["winner bracket", "looser bracket"]:
-            for channel in channels:
-                # Channel names correspond to a suggested play order
-                if int(channel.name) not in play_orders: # If the channel is not useful anymore
-                    last_message = await channel.fetch_message(channel.last_message_id)
-                    # Remove the channel if the last message is more than 5 minutes old
-                    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
-                    if now - last_message.created_at > datetime.timedelta(minutes = 5):
-                        try:
-                            await channel.delete()
-                        except (discord.NotFound, discord.HTTPException):
-                            pass
+channels_to_clean = set() # play orders of finished sets whose channel may still exist
+
+async def clean_channels(guild, events):
+
+    for event in events:
+        if isinstance(event, MatchCompleted):
+            channels_to_clean.add(event.match["suggested_play_order"])
+        elif isinstance(event, MatchReopened):
+            channels_to_clean.discard(event.match["suggested_play_order"])
+
+    # On the first poll after a (re)start, look for channels left behind
+    first_poll = bracket_snapshot.polls == 1
+
+    if not channels_to_clean and not first_poll: return
+
+    set_channels.load(guild)
+    remaining = set()
+
+    for play_order in set_channels.play_orders():
+        if play_order in channels_to_clean or (first_poll and not bracket_snapshot.is_open(play_order)): # If the channel is not useful anymore
+            channel = set_channels.get(guild, play_order)
+            if channel == None: continue # deleted by hand
+            if channel.id not in activity.last_message and channel.id not in activity.tracked: # not seen since the restart
+                try:
+                    await activity.backfill(channel, limit=1)
+                except discord.NotFound:
+                    continue
+            last_message = activity.last_message.get(channel.id, datetime.datetime.min)
+            # Remove the channel if the last message is more than 5 minutes old
+            now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+            if now - last_message > datetime.timedelta(minutes = 5):
+                try:
+                    await release_channel(channel, play_order)
+                except discord.HTTPException as e:
+                    log.warning(f"Could not release the channel of set {play_order} : {e}")
+                    remaining.add(play_order) # tried again at the next poll
+            else:
+                remaining.add(play_order)
+
+    channels_to_clean.intersection_update(remaining) # forget deleted or missing channels
+    channels_to_clean.update(remaining)
+
+
+### Give a set channel back to the pool (or delete it)
+### Sets unmarked on Challonge are launched again : their previous channel goes first
+async def release_unmarked(guild, events):
+    for event in events:
+        if isinstance(event, MatchUnmarked):
+            play_order = event.match["suggested_play_order"]
+            channel = set_channels.get(guild, play_order)
+            if channel == None: continue
+            try:
+                await release_channel(channel, play_order)
+            except discord.HTTPException as e:
+                log.warning(f"Could not release the channel of set {play_order} : {e}")
+
+async def release_channel(channel, play_order):
+    try:
+        scheduler.remove_job(f'check activity of set {play_order}') # the channel may be reused before it runs
+    except JobLookupError:
+        pass
+
+    try:
+        await channel_pool.release(channel)
+    except discord.NotFound: # already deleted
+        pass
+
+    # Only once it's done : a channel that couldn't be released is still known, and cleaned later
+    set_channels.remove(play_order)
+    activity.forget(channel.id)
+
+### Create the free channels of the pool before the first sets are launched
+async def fill_channel_pool():
+    guild = bot.get_guild(id=guild_id)
+    channel_pool.load(guild)
+
+    for match_round, side in zip([1, -1], SIDES):
+        while channel_pool.missing(side) > 0:
+            category = await get_available_category(match_round)
+            try:
+                channel = await guild.create_text_channel(
+                    POOL_NAME,
+                    overwrites = channel_pool.free_overwrites(guild),
+                    category = category,
+                    topic = "Channel libre, réutilisé pour un prochain set.",
+                    reason = "Channels des sets créés à l'avance"
+                )
+            except discord.HTTPException:
+                break
+            finally:
+                release_category(category)
+            channel_pool.add(side, channel)
 
 
 ### Forfeit
@@ -919,35 +1282,28 @@ async def clean_channels(guild, bracket):
 @commands.check(tournament_is_underway)
 @commands.has_role(challenger_id)
 @commands.cooldown(1, 120, type=commands.BucketType.user)
-@commands.max_concurrency(1, wait=True)
 async def forfeit_match(ctx):
+    await queue_score_report(ctx, lambda match: report_forfeit(ctx, match))
+
+async def report_forfeit(ctx, match):
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     looser = participants[ctx.author.id]["challonge"]
 
-    try:
-        match = await async_http_retry(
-            achallonge.matches.index,
-            tournoi['id'],
-            state='open',
-            participant_id=looser
-        )
-    except ChallongeException:
+    if match == None: # read by with_match_lock
         await ctx.message.add_reaction("⚠️")
         return
 
     try:
-        for joueur in participants:
-            if participants[joueur]["challonge"] == match[0]["player1_id"]: player1 = joueur
-            if participants[joueur]["challonge"] == match[0]["player2_id"]: player2 = joueur
+        player1, player2 = match[0]["player1_id"], match[0]["player2_id"]
     except IndexError:
         return
 
-    if looser == participants[player2]["challonge"]:
-        winner, score = participants[player1]["challonge"], "1-0"
+    if looser == player2:
+        winner, score = player1, "1-0"
     else:
-        winner, score = participants[player2]["challonge"], "0-1"
+        winner, score = player2, "0-1"
 
     try:
         await async_http_retry(
@@ -960,140 +1316,200 @@ async def forfeit_match(ctx):
     except ChallongeException:
         await ctx.message.add_reaction("⚠️")
     else:
+        bracket_model.report(match[0]['id'], winner)
+        polling.report()
+        poll_soon()
         await ctx.message.add_reaction("✅")
 
 
 ### Get and return a category
+category_lock = asyncio.Lock()
+category_reservations = {} # category id -> channels being created in it
+
 async def get_available_category(match_round):
     guild = bot.get_guild(id=guild_id)
     desired_cat = 'winner bracket' if match_round > 0 else 'looser bracket'
 
-    # by_category() doesn't return a category if it has no channels, so we use a list comprehension
-    for category in [cat for cat in guild.categories if cat.name.lower() == desired_cat and len(cat.channels) < 50]:
+    # Sets are launched concurrently : pick (or create) the category and reserve a slot in one go
+    async with category_lock:
+        # by_category() doesn't return a category if it has no channels, so we use a list comprehension
+        for category in [cat for cat in guild.categories if cat.name.lower() == desired_cat and len(cat.channels) + category_reservations.get(cat.id, 0) < 50]:
+            break
+
+        else:
+            category = await guild.create_category(
+                name=desired_cat,
+                reason='Since no category was available, a new one was created'
+            )
+            # kwarg 'position' will be supported in next discord.py release, for now we have to edit
+            await category.edit(position = guild.get_channel(tournoi_cat_id).position + 1)
+
+        category_reservations[category.id] = category_reservations.get(category.id, 0) + 1
         return category
 
-    else:
-        new_category = await guild.create_category(
-            name=desired_cat,
-            reason='Since no category was available, a new one was created'
-        )
-        # kwarg 'position' will be supported in next discord.py release, for now we have to edit
-        await new_category.edit(position = guild.get_channel(tournoi_cat_id).position + 1)
-        return new_category
+def release_category(category):
+    category_reservations[category.id] -= 1
+    if category_reservations[category.id] <= 0: del category_reservations[category.id]
 
 
 ### Lancer matchs ouverts
+sets_bloques = set() # play orders that can't be launched, TOs already warned
+
 async def launch_matches(guild, bracket):
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    semaphore = asyncio.Semaphore(launch_concurrency)
+
+    async def launch(match):
+        async with semaphore:
+            try:
+                return await launch_match(guild, match)
+            except (ChallongeException, discord.HTTPException) as e:
+                log.warning(f"Could not launch set {match['suggested_play_order']} : {e}")
+            except Exception as e: # one set failing must not lose the summary of the others
+                log.error(f"Error while launching set {match['suggested_play_order']}", exc_info=e)
+            return ""
+
+    matches = [x for x in bracket if x["underway_at"] == None][:launch_per_tick:]
 
-    sets = ""
+    # The summary keeps the order of the bracket, whatever the order sets were launched in
+    sets = "".join(await asyncio.gather(*[launch(match) for match in matches]))
 
-    for match in [x for x in bracket if x["underway_at"] == None][:20:]: # "Only" lauch 20 max at once
+    outbox.send(bot.get_channel(queue_channel_id), sets) # split in pages of less than 2000 characters by the outbox
 
-        await async_http_retry(achallonge.matches.mark_as_underway, tournoi["id"], match["id"])
 
-        for joueur in participants:
-            if participants[joueur]["challonge"] == match["player1_id"]: player1 = guild.get_member(joueur)
-            if participants[joueur]["challonge"] == match["player2_id"]: player2 = guild.get_member(joueur)
+async def launch_match(guild, match):
 
-        top_8 = "(**top 8**) :fire:" if is_top8(match["round"]) else ""
+    tournoi = get_tournoi()
 
-        # Création d'un channel volatile pour le set
+    player1 = guild.get_member(participants_index.discord_id(match["player1_id"]))
+    player2 = guild.get_member(participants_index.discord_id(match["player2_id"]))
+
+    # A player left the server : the set stays open on Challonge until a TO decides
+    if player1 == None or player2 == None:
+        if match["suggested_play_order"] not in sets_bloques:
+            sets_bloques.add(match["suggested_play_order"])
+            outbox.send(bot.get_channel(to_channel_id), f":warning: Le set n°{match['suggested_play_order']} ne peut pas être lancé : un des joueurs n'est plus sur le serveur. Une décision d'un TO doit être prise.")
+        return ""
+
+    await async_http_retry(achallonge.matches.mark_as_underway, tournoi["id"], match["id"])
+
+    try:
+        return await setup_match(guild, match, player1, player2)
+    except Exception:
+        # Not underway anymore, so it is launched again at the next poll
         try:
-            gaming_channel = await guild.create_text_channel(
-                str(match["suggested_play_order"]),
-                overwrites = {
-                    guild.default_role: discord.PermissionOverwrite(read_messages=False),
-                    guild.get_role(to_id): discord.PermissionOverwrite(read_messages=True),
-                    guild.get_role(streamer_id): discord.PermissionOverwrite(read_messages=True),
-                    player1: discord.PermissionOverwrite(read_messages=True),
-                    player2: discord.PermissionOverwrite(read_messages=True)
-                },
-                category = await get_available_category(match['round']),
-                topic = "Channel temporaire pour un set.",
-                reason = f"Lancement du set n°{match['suggested_play_order']}"
-            )
+            await async_http_retry(achallonge.matches.unmark_as_underway, tournoi["id"], match["id"])
+        except ChallongeException as e:
+            log.warning(f"Could not unmark set {match['suggested_play_order']} as underway : {e}")
+        raise
+
+
+async def setup_match(guild, match, player1, player2):
+
+    tournoi = get_tournoi()
+
+    infos = round_info(match["round"])
+    top_8 = "(**top 8**) :fire:" if infos.top8 else ""
+
+    # Channel volatile pour le set : repris du pool si possible, créé sinon
+    settings = {
+        "name": str(match["suggested_play_order"]),
+        "overwrites": {
+            guild.default_role: discord.PermissionOverwrite(read_messages=False),
+            guild.get_role(to_id): discord.PermissionOverwrite(read_messages=True),
+            guild.get_role(streamer_id): discord.PermissionOverwrite(read_messages=True),
+            player1: discord.PermissionOverwrite(read_messages=True),
+            player2: discord.PermissionOverwrite(read_messages=True)
+        },
+        "topic": "Channel temporaire pour un set.",
+        "reason": f"Lancement du set n°{match['suggested_play_order']}"
+    }
 
-        except discord.HTTPException:
-            gaming_channel_txt = f":video_game: Je n'ai pas pu créer de channel, faites votre set en MP ou dans <#{tournoi_channel_id}>."
+    try:
+        channel_pool.load(guild)
+        gaming_channel = await channel_pool.acquire('winner bracket' if match['round'] > 0 else 'looser bracket', **settings)
 
-            if is_queued_for_stream(match["suggested_play_order"]):
-                await player1.send(f"Tu joueras on stream pour ton prochain set contre **{player2.display_name}** : je te communiquerai les codes d'accès quand ce sera ton tour.")
-                await player2.send(f"Tu joueras on stream pour ton prochain set contre **{player1.display_name}** : je te communiquerai les codes d'accès quand ce sera ton tour.")
+        if gaming_channel == None:
+            category = await get_available_category(match['round'])
+            try:
+                gaming_channel = await guild.create_text_channel(category = category, **settings)
+            finally:
+                release_category(category) # the channel is now counted in the category
 
-        else:
-            gaming_channel_txt = f":video_game: Allez faire votre set dans le channel <#{gaming_channel.id}> !"
+    except discord.HTTPException:
+        gaming_channel_txt = f":video_game: Je n'ai pas pu créer de channel, faites votre set en MP ou dans <#{tournoi_channel_id}>."
 
-            with open(gamelist_path, 'r+') as f: gamelist = yaml.full_load(f)
+        if is_queued_for_stream(match["suggested_play_order"]):
+            for player, opponent in [(player1, player2), (player2, player1)]:
+                try:
+                    await player.send(f"Tu joueras on stream pour ton prochain set contre **{opponent.display_name}** : je te communiquerai les codes d'accès quand ce sera ton tour.")
+                except discord.Forbidden:
+                    pass
 
-            gaming_channel_annonce = (f":arrow_forward: **{nom_round(match['round'])}** : <@{player1.id}> vs <@{player2.id}> {top_8}\n"
-                                      f":white_small_square: Les règles du set doivent suivre celles énoncées dans <#{gamelist[tournoi['game']]['ruleset']}>.\n"
-                                      f":white_small_square: La liste des stages légaux à l'heure actuelle est disponible via la commande `{bot_prefix}stages`.\n"
-                                      f":white_small_square: En cas de lag qui rend la partie injouable, utilisez la commande `{bot_prefix}lag` pour résoudre la situation.\n"
-                                      f":white_small_square: **Dès que le set est terminé**, le gagnant envoie le score dans <#{scores_channel_id}> avec la commande `{bot_prefix}win`.\n\n"
-                                      f":game_die: **{random.choice([player1.display_name, player2.display_name])}** est tiré au sort pour commencer le ban des stages *({gamelist[tournoi['game']]['ban_instruction']})*.\n")
+    else:
+        set_channels.add(match["suggested_play_order"], gaming_channel)
+        activity.start(gaming_channel.id) # everything said in the channel from now on goes through on_message
+        gaming_channel_txt = f":video_game: Allez faire votre set dans le channel <#{gaming_channel.id}> !"
 
-            if tournoi["game"] == "Project+":
-                gaming_channel_annonce += f"{gamelist[tournoi['game']]['icon']} **Minimum buffer suggéré** : le host peut le faire calculer avec la commande `{bot_prefix}buffer [ping]`.\n"
+        gamelist = get_gamelist()
 
-            if is_bo5(match["round"]):
-                gaming_channel_annonce += ":five: Vous devez jouer ce set en **BO5** *(best of five)*.\n"
-            else:
-                gaming_channel_annonce += ":three: Vous devez jouer ce set en **BO3** *(best of three)*.\n"
-
-            if not is_top8(match["round"]):
-                scheduler.add_job(
-                    check_channel_activity,
-                    id = f'check activity of set {gaming_channel.name}',
-                    args = [gaming_channel, player1, player2],
-                    run_date = datetime.datetime.now() + datetime.timedelta(minutes = tournoi["check_channel_presence"])
-                )
+        gaming_channel_annonce = (f":arrow_forward: **{infos.name}** : <@{player1.id}> vs <@{player2.id}> {top_8}\n"
+                                  f":white_small_square: Les règles du set doivent suivre celles énoncées dans <#{gamelist[tournoi['game']].ruleset}>.\n"
+                                  f":white_small_square: La liste des stages légaux à l'heure actuelle est disponible via la commande `{bot_prefix}stages`.\n"
+                                  f":white_small_square: En cas de lag qui rend la partie injouable, utilisez la commande `{bot_prefix}lag` pour résoudre la situation.\n"
+                                  f":white_small_square: **Dès que le set est terminé**, le gagnant envoie le score dans <#{scores_channel_id}> avec la commande `{bot_prefix}win`.\n\n"
+                                  f":game_die: **{random.choice([player1.display_name, player2.display_name])}** est tiré au sort pour commencer le ban des stages *({gamelist[tournoi['game']].ban_instruction})*.\n")
 
-            if is_queued_for_stream(match["suggested_play_order"]):
-                gaming_channel_annonce += ":tv: **Vous jouerez on stream**. Dès que ce sera votre tour, je vous communiquerai les codes d'accès."
+        if tournoi["game"] == "Project+":
+            gaming_channel_annonce += f"{gamelist[tournoi['game']].icon} **Minimum buffer suggéré** : le host peut le faire calculer avec la commande `{bot_prefix}buffer [ping]`.\n"
 
-            await gaming_channel.send(gaming_channel_annonce)
+        if infos.bo5:
+            gaming_channel_annonce += ":five: Vous devez jouer ce set en **BO5** *(best of five)*.\n"
+        else:
+            gaming_channel_annonce += ":three: Vous devez jouer ce set en **BO3** *(best of three)*.\n"
+
+        if not infos.top8:
+            scheduler.add_job(
+                check_channel_activity,
+                id = f'check activity of set {match["suggested_play_order"]}',
+                args = [gaming_channel, player1, player2],
+                run_date = datetime.datetime.now() + datetime.timedelta(minutes = tournoi["check_channel_presence"]),
+                replace_existing = True # set launched again after a failure
+            )
 
-        on_stream = "(**on stream**) :tv:" if is_queued_for_stream(match["suggested_play_order"]) else ""
-        bo_type = 'BO5' if is_bo5(match['round']) else 'BO3'
+        if is_queued_for_stream(match["suggested_play_order"]):
+            gaming_channel_annonce += ":tv: **Vous jouerez on stream**. Dès que ce sera votre tour, je vous communiquerai les codes d'accès."
 
-        sets += f":arrow_forward: **{nom_round(match['round'])}** ({bo_type}) : <@{player1.id}> vs <@{player2.id}> {on_stream}\n{gaming_channel_txt} {top_8}\n\n"
+        outbox.send(gaming_channel, gaming_channel_annonce)
 
-    if sets != "":
-        if len(sets) < 2000:
-            await bot.get_channel(queue_channel_id).send(sets)
-        else: # Discord doesn't deal with more than 2000 characters
-            sets = [x.strip() for x in sets.split('\n\n') if x.strip() != ''] # so we have to split
-            while sets:
-                await bot.get_channel(queue_channel_id).send('\n\n'.join(sets[:10]))
-                del sets[:10] # and send by groups of ten sets
+    on_stream = "(**on stream**) :tv:" if is_queued_for_stream(match["suggested_play_order"]) else ""
+    bo_type = 'BO5' if infos.bo5 else 'BO3'
 
+    return f":arrow_forward: **{infos.name}** ({bo_type}) : <@{player1.id}> vs <@{player2.id}> {on_stream}\n{gaming_channel_txt} {top_8}\n\n"
 
-async def check_channel_activity(channel, player1, player2):
-    player1_is_active, player2_is_active = False, False
 
+async def check_channel_activity(channel, player1, player2):
     try:
-        async for message in channel.history():
-            if message.author.id == player1.id:
-                player1_is_active = True
-            if message.author.id == player2.id:
-                player2_is_active = True
-            if player1_is_active and player2_is_active:
-                return
+        await watch_channel(channel)
     except discord.NotFound:
         return
 
+    player1_is_active = activity.has_spoken(channel.id, player1.id)
+    player2_is_active = activity.has_spoken(channel.id, player2.id)
+
+    if player1_is_active and player2_is_active:
+        return
+
     if player1_is_active == False:
-        await channel.send(f":timer: **DQ automatique de <@{player1.id}> pour inactivité** : aucune manifestation à temps du joueur.")
+        outbox.send(channel, f":timer: **DQ automatique de <@{player1.id}> pour inactivité** : aucune manifestation à temps du joueur.")
         await desinscrire(player1)
-        await bot.get_channel(to_channel_id).send(f":information_source: **DQ automatique** de <@{player1.id}> pour inactivité, set n°{channel.name}.")
+        outbox.send(bot.get_channel(to_channel_id), f":information_source: **DQ automatique** de <@{player1.id}> pour inactivité, set n°{channel.name}.")
         await player1.send("Désolé, tu as été DQ automatiquement car tu n'as pas été actif sur ton channel de set dans les premières minutes qui ont suivi son lancement.")
 
     if player2_is_active == False:
-        await channel.send(f":timer: **DQ automatique de <@{player2.id}> pour inactivité** : aucune manifestation à temps du joueur.")
+        outbox.send(channel, f":timer: **DQ automatique de <@{player2.id}> pour inactivité** : aucune manifestation à temps du joueur.")
         await desinscrire(player2)
-        await bot.get_channel(to_channel_id).send(f":information_source: **DQ automatique** de <@{player2.id}> pour inactivité, set n°{channel.name}.")
+        outbox.send(bot.get_channel(to_channel_id), f":information_source: **DQ automatique** de <@{player2.id}> pour inactivité, set n°{channel.name}.")
         await player2.send("Désolé, tu as été DQ automatiquement car tu n'as pas été actif sur ton channel de set dans les premières minutes qui ont suivi son lancement.")
 
 
@@ -1101,16 +1517,8 @@ async def check_channel_activity(channel, player1, player2):
 @commands.has_role(streamer_id)
 @commands.check(tournament_is_underway_or_pending)
 async def init_stream(ctx, arg):
-    with open(stream_path, 'r+') as f: stream = json.load(f, object_pairs_hook=int_keys)
-
     if re.compile(r"^(https?\:\/\/)?(www.twitch.tv)\/.+$").match(arg):
-        stream[ctx.author.id] = {
-            'channel': arg.replace("https://www.twitch.tv/", ""),
-            'access': ['N/A', 'N/A'],
-            'on_stream': None,
-            'queue': []
-        }
-        with open(stream_path, 'w') as f: json.dump(stream, f, indent=4)
+        stream_manager.init_stream(ctx.author.id, arg.replace("https://www.twitch.tv/", ""))
         await ctx.message.add_reaction("✅")
     else:
         await ctx.message.add_reaction("🔗")
@@ -1121,16 +1529,14 @@ async def init_stream(ctx, arg):
 @commands.check(tournament_is_underway_or_pending)
 @commands.check(is_streaming)
 async def stop_stream(ctx):
-    with open(stream_path, 'r+') as f: stream = json.load(f, object_pairs_hook=int_keys)
-    del stream[ctx.author.id]
-    with open(stream_path, 'w') as f: json.dump(stream, f, indent=4)
+    stream_manager.stop_stream(ctx.author.id)
     await ctx.message.add_reaction("✅")
 
 
 @bot.command(name='stream', aliases=['twitch', 'tv'])
 @commands.check(tournament_is_underway_or_pending)
 async def post_stream(ctx):
-    with open(stream_path, 'r+') as f: stream = json.load(f, object_pairs_hook=int_keys)
+    stream = stream_manager
 
     if len(stream) == 0:
         await ctx.send(f"<@{ctx.author.id}> Il n'y a pas de stream en cours (ou prévu) pour ce tournoi à l'heure actuelle.")
@@ -1150,21 +1556,19 @@ async def post_stream(ctx):
 @commands.check(is_streaming)
 async def setup_stream(ctx, *args):
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
-    with open(stream_path, 'r+') as f: stream = json.load(f, object_pairs_hook=int_keys)
+    tournoi = get_tournoi()
 
     if tournoi['game'] == 'Super Smash Bros. Ultimate' and len(args) == 2:
-        stream[ctx.author.id]["access"] = args
+        stream_manager.set_access(ctx.author.id, args)
 
     elif tournoi['game'] == 'Project+' and len(args) == 1:
-        stream[ctx.author.id]["access"] = args
+        stream_manager.set_access(ctx.author.id, args)
 
     else:
         await ctx.message.add_reaction("⚠️")
         await ctx.send(f"<@{ctx.author.id}> Paramètres invalides pour le jeu **{tournoi['game']}**.")
         return
 
-    with open(stream_path, 'w') as f: json.dump(stream, f, indent=4)
     await ctx.message.add_reaction("✅")
 
 
@@ -1176,31 +1580,24 @@ async def setup_stream(ctx, *args):
 @commands.max_concurrency(1, wait=True)
 async def add_stream(ctx, *args: int):
 
-    with open(stream_path, 'r+') as f: stream = json.load(f, object_pairs_hook=int_keys)
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     # Pre-add before the tournament goes underway - BE CAREFUL!
     if tournoi["statut"] == "pending":
-        for arg in args: stream[ctx.author.id]["queue"].append(arg)
-        with open(stream_path, 'w') as f: json.dump(stream, f, indent=4)
+        stream_manager.add_to_queue(ctx.author.id, args)
         await ctx.message.add_reaction("✅")
         await ctx.send(f"<@{ctx.author.id}> Sets ajoutés à la stream queue : toutefois ils n'ont pas été vérifiés, le bracket n'ayant pas commencé.")
         return
 
     # Otherwise we should check if the sets are open
     try:
-        bracket = await async_http_retry(achallonge.matches.index, tournoi['id'], state=('open', 'pending'))
+        not_underway = (await get_bracket_model()).not_underway()
     except ChallongeException:
         await ctx.message.add_reaction("🕐")
         return
 
-    for arg in args:
-        for match in bracket:
-            if (match["suggested_play_order"] == arg) and (match["underway_at"] == None) and (not is_queued_for_stream(arg)):
-                stream[ctx.author.id]["queue"].append(arg)
-                break
+    stream_manager.add_to_queue(ctx.author.id, [arg for arg in args if arg in not_underway])
 
-    with open(stream_path, 'w') as f: json.dump(stream, f, indent=4)
     await ctx.message.add_reaction("✅")
 
 
@@ -1210,14 +1607,11 @@ async def add_stream(ctx, *args: int):
 @commands.check(tournament_is_underway_or_pending)
 @commands.check(is_streaming)
 async def remove_stream(ctx, *args: int):
-    with open(stream_path, 'r+') as f: stream = json.load(f, object_pairs_hook=int_keys)
-
     try:
-        for arg in args: stream[ctx.author.id]["queue"].remove(arg)
+        stream_manager.remove_from_queue(ctx.author.id, args)
     except ValueError:
         await ctx.message.add_reaction("⚠️")
     else:
-        with open(stream_path, 'w') as f: json.dump(stream, f, indent=4)
         await ctx.message.add_reaction("✅")
 
 
@@ -1227,15 +1621,11 @@ async def remove_stream(ctx, *args: int):
 @commands.check(tournament_is_underway_or_pending)
 @commands.check(is_streaming)
 async def swap_stream(ctx, arg1: int, arg2: int):
-    with open(stream_path, 'r+') as f: stream = json.load(f, object_pairs_hook=int_keys)
-
     try:
-        x, y = stream[ctx.author.id]["queue"].index(arg1), stream[ctx.author.id]["queue"].index(arg2)
+        stream_manager.swap(ctx.author.id, arg1, arg2)
     except ValueError:
         await ctx.message.add_reaction("⚠️")
     else:
-        stream[ctx.author.id]["queue"][y], stream[ctx.author.id]["queue"][x] = stream[ctx.author.id]["queue"][x], stream[ctx.author.id]["queue"][y]
-        with open(stream_path, 'w') as f: json.dump(stream, f, indent=4)
         await ctx.message.add_reaction("✅")
 
 
@@ -1247,45 +1637,38 @@ async def swap_stream(ctx, arg1: int, arg2: int):
 @commands.max_concurrency(1, wait=True)
 async def list_stream(ctx):
 
-    with open(stream_path, 'r+') as f: stream = json.load(f, object_pairs_hook=int_keys)
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    stream = stream_manager
 
     try:
-        bracket = await async_http_retry(achallonge.matches.index, tournoi['id'], state=('open', 'pending'))
+        model = await get_bracket_model()
     except ChallongeException:
         await ctx.message.add_reaction("🕐")
         return
 
     msg = f":information_source: Codes d'accès au stream **{stream[ctx.author.id]['channel']}** :\n{get_access_stream(stream[ctx.author.id]['access'])}\n"
 
-    try:
-        match = bracket[[x["suggested_play_order"] for x in bracket].index(stream[ctx.author.id]['on_stream'])]
-    except KeyError: # bracket is empty
+    match = model.get_active(stream[ctx.author.id]['on_stream'])
+
+    if not model.matches: # bracket is empty
         msg += ":stop_button: Le tournoi n'est probablement pas en cours.\n"
-    except ValueError: # on stream not found
+    elif match == None: # on stream not found
         msg += ":stop_button: Aucun set on stream à l'heure actuelle.\n"
     else:
-        for joueur in participants:
-            if participants[joueur]["challonge"] == match["player1_id"]: player1 = participants[joueur]['display_name']
-            if participants[joueur]["challonge"] == match["player2_id"]: player2 = participants[joueur]['display_name']
+        player1 = participants_index.display_name(match["player1_id"])
+        player2 = participants_index.display_name(match["player2_id"])
 
         msg += f":arrow_forward: **Set on stream actuel** *({match['suggested_play_order']})* : **{player1}** vs **{player2}**\n"
 
     list_stream = ""
 
     for order in stream[ctx.author.id]['queue']:
-        for match in bracket:
-            if match["suggested_play_order"] == order:
+        match = model.get_active(order)
+        if match != None:
 
-                player1, player2 = "(?)", "(?)"
-                for joueur in participants:
-                    if participants[joueur]["challonge"] == match["player1_id"]:
-                        player1 = participants[joueur]['display_name']
-                    if participants[joueur]["challonge"] == match["player2_id"]:
-                        player2 = participants[joueur]['display_name']
+            player1 = participants_index.display_name(match["player1_id"], "(?)")
+            player2 = participants_index.display_name(match["player2_id"], "(?)")
 
-                list_stream += f":white_small_square: **{match['suggested_play_order']}** : *{player1}* vs *{player2}*\n"
-                break
+            list_stream += f":white_small_square: **{match['suggested_play_order']}** : *{player1}* vs *{player2}*\n"
 
     if list_stream != "":
         msg += f":play_pause: Liste des sets prévus pour passer on stream :\n{list_stream}"
@@ -1296,57 +1679,49 @@ async def list_stream(ctx):
 
 
 ### Appeler les joueurs on stream
-async def call_stream(guild, bracket):
-
-    with open(stream_path, 'r+') as f: stream = json.load(f, object_pairs_hook=int_keys)
+async def call_stream(guild):
 
-    play_orders = [match["suggested_play_order"] for match in bracket]
+    stream = stream_manager
 
     for streamer in stream:
 
         # If current on stream set is still open, then it's not finished
-        if stream[streamer]["on_stream"] in play_orders: continue
+        if bracket_snapshot.is_open(stream[streamer]["on_stream"]): continue
 
         try:
-            match = bracket[play_orders.index(stream[streamer]["queue"][0])]
-        except (IndexError, ValueError): # stream queue is empty / match could be pending
+            match = bracket_snapshot.get(stream[streamer]["queue"][0])
+        except IndexError: # stream queue is empty
             continue
-        else: # wait for the match to be marked as underway
-            if match["underway_at"] == None: continue
 
-        for joueur in participants:
-            if participants[joueur]["challonge"] == match["player1_id"]: player1 = guild.get_member(joueur)
-            if participants[joueur]["challonge"] == match["player2_id"]: player2 = guild.get_member(joueur)
+        # match could be pending / wait for the match to be marked as underway
+        if match == None or match["underway_at"] == None: continue
 
-        gaming_channel = discord.utils.get(guild.text_channels, name=str(match["suggested_play_order"]))
+        player1 = guild.get_member(participants_index.discord_id(match["player1_id"]))
+        player2 = guild.get_member(participants_index.discord_id(match["player2_id"]))
+
+        gaming_channel = set_channels.get(guild, match["suggested_play_order"])
 
         if gaming_channel == None:
             dm_msg = f"C'est ton tour de passer on stream ! Voici les codes d'accès :\n{get_access_stream(stream[streamer]['access'])}"
             await player1.send(dm_msg)
             await player2.send(dm_msg)
         else:
-            await gaming_channel.send(f"<@{player1.id}> <@{player2.id}>\n" # ping them
+            outbox.send(gaming_channel, f"<@{player1.id}> <@{player2.id}>\n" # ping them
                                       f":clapper: Vous pouvez passer on stream sur la chaîne **{stream[streamer]['channel']}** ! "
                                       f"Voici les codes d'accès :\n{get_access_stream(stream[streamer]['access'])}")
 
-        await bot.get_channel(stream_channel_id).send(f":arrow_forward: Envoi on stream du set n°{match['suggested_play_order']} chez **{stream[streamer]['channel']}** : "
+        outbox.send(bot.get_channel(stream_channel_id), f":arrow_forward: Envoi on stream du set n°{match['suggested_play_order']} chez **{stream[streamer]['channel']}** : "
                                                       f"**{participants[player1.id]['display_name']}** vs **{participants[player2.id]['display_name']}** !")
 
-        stream[streamer]["on_stream"] = match["suggested_play_order"]
-
-        while match["suggested_play_order"] in stream[streamer]["queue"]:
-            stream[streamer]["queue"].remove(match["suggested_play_order"])
-
-        with open(stream_path, 'w') as f: json.dump(stream, f, indent=4)
+        stream_manager.set_on_stream(streamer, match["suggested_play_order"])
 
 
 ### Calculer les rounds à partir desquels un set est top 8 (bracket D.E.)
 async def calculate_top8():
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
-    bracket = await async_http_retry(achallonge.matches.index, tournoi['id'], state=("open", "pending"))
+    tournoi = get_tournoi()
 
     # Get all rounds from bracket
-    rounds = [match["round"] for match in bracket]
+    rounds = (await get_bracket_model()).rounds()
 
     # Calculate top 8
     tournoi["round_winner_top8"] = max(rounds) - 2
@@ -1375,16 +1750,22 @@ async def calculate_top8():
     if tournoi["round_looser_bo5"] < min(rounds): tournoi["round_looser_bo5"] = min(rounds)
     if tournoi["round_looser_bo5"] > -1: tournoi["round_looser_bo5"] = -1
 
-    with open(tournoi_path, 'w') as f: json.dump(tournoi, f, indent=4, default=dateconverter)
+    # Round names, top 8 and BO5 won't change anymore
+    build_round_table(tournoi, rounds)
+
+    dump_tournoi(tournoi)
 
 
 ### Lancer un rappel de matchs
 async def rappel_matches(guild, bracket):
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     for match in bracket:
 
+        # Already warned and timed out : nothing left to do for this set
+        if match["suggested_play_order"] in tournoi["warned"] and match["suggested_play_order"] in tournoi["timeout"]: continue
+
         if (match["underway_at"] != None) and (not is_queued_for_stream(match["suggested_play_order"])) and (not is_on_stream(match["suggested_play_order"])):
 
             debut_set = dateutil.parser.parse(str(match["underway_at"])).replace(tzinfo=None)
@@ -1398,85 +1779,76 @@ async def rappel_matches(guild, bracket):
 
             if datetime.datetime.now() - debut_set > datetime.timedelta(minutes = seuil):
 
-                gaming_channel = discord.utils.get(guild.text_channels, name=str(match["suggested_play_order"]))
+                gaming_channel = set_channels.get(guild, match["suggested_play_order"])
 
                 if gaming_channel != None:
 
-                    for joueur in participants:
-                        if participants[joueur]["challonge"] == match["player1_id"]: player1 = guild.get_member(joueur)
-                        if participants[joueur]["challonge"] == match["player2_id"]: player2 = guild.get_member(joueur)
+                    player1 = guild.get_member(participants_index.discord_id(match["player1_id"]))
+                    player2 = guild.get_member(participants_index.discord_id(match["player2_id"]))
 
                     # Avertissement unique
                     if match["suggested_play_order"] not in tournoi["warned"]:
 
                         tournoi["warned"].append(match["suggested_play_order"])
-                        with open(tournoi_path, 'w') as f: json.dump(tournoi, f, indent=4, default=dateconverter)
+                        dump_tournoi(tournoi)
 
                         alerte = (f":timer: **Ce set n'a toujours pas reçu de score !** <@{player1.id}> <@{player2.id}>\n"
                                   f":white_small_square: Le gagnant du set est prié de le poster dans <#{scores_channel_id}> dès que possible.\n"
                                   f":white_small_square: Dans une dizaine de minutes, les TOs seront alertés qu'une décision doit être prise.\n"
                                   f":white_small_square: Si une personne est détectée comme inactive, elle sera **DQ automatiquement** du tournoi.\n")
 
-                        await gaming_channel.send(alerte)
+                        outbox.send(gaming_channel, alerte)
 
                     # DQ pour inactivité (exceptionnel...) -> fixé à 10 minutes après l'avertissement
                     elif (match["suggested_play_order"] not in tournoi["timeout"]) and (datetime.datetime.now() - debut_set > datetime.timedelta(minutes = seuil + 10)):
 
                         tournoi["timeout"].append(match["suggested_play_order"])
-                        with open(tournoi_path, 'w') as f: json.dump(tournoi, f, indent=4, default=dateconverter)
+                        dump_tournoi(tournoi)
 
-                        async for message in gaming_channel.history(): # Rechercher qui est la dernière personne active du channel
+                        await watch_channel(gaming_channel)
 
-                            if (message.author != bot.user) and (to_id not in [y.id for y in message.author.roles]): # La personne ne doit être ni un bot ni un TO, donc un joueur
+                        # Les deux dernières personnes actives du channel, ni bot ni TO, donc des joueurs
+                        actifs = [(author, last_activity) for author, last_activity in activity.latest_authors(gaming_channel.id) if is_player(guild, author)][:2]
 
-                                try:
-                                    winner
-                                except NameError:
-                                    winner, winner_last_activity = message.author, message.created_at # Le premier résultat sera assigné à winner
-                                else:
-                                    if message.author != winner:
-                                        looser, looser_last_activity = message.author, message.created_at # Le second résultat sera assigné à looser
-                                        break
-
-                        try:
-                            winner
-                        except NameError: # S'il n'y a jamais eu de résultat, aucun joueur n'a donc été actif : DQ des deux 
-                            await gaming_channel.send(f"<@&{to_id}> **DQ automatique des __2 joueurs__ pour inactivité : <@{player1.id}> & <@{player2.id}>**")
+                        if len(actifs) == 0: # Aucun joueur n'a été actif : DQ des deux
+                            outbox.send(gaming_channel, f"<@&{to_id}> **DQ automatique des __2 joueurs__ pour inactivité : <@{player1.id}> & <@{player2.id}>**")
                             await async_http_retry(achallonge.participants.destroy, tournoi["id"], participants[player1.id]['challonge'])
                             await async_http_retry(achallonge.participants.destroy, tournoi["id"], participants[player2.id]['challonge'])
                             continue
 
-                        try:
-                            looser
-                        except NameError: # S'il n'y a pas eu de résultat pour un second joueur différent : DQ de l'inactif
-                            looser = player2 if winner.id == player1.id else player1
-                            await gaming_channel.send(f"<@&{to_id}> **DQ automatique de <@{looser.id}> pour inactivité.**")
-                            await async_http_retry(achallonge.participants.destroy, tournoi["id"], participants[looser.id]['challonge'])
+                        winner, winner_last_activity = actifs[0]
+
+                        if len(actifs) == 1: # Pas de second joueur actif : DQ de l'inactif
+                            looser = player2.id if winner == player1.id else player1.id
+                            outbox.send(gaming_channel, f"<@&{to_id}> **DQ automatique de <@{looser}> pour inactivité.**")
+                            await async_http_retry(achallonge.participants.destroy, tournoi["id"], participants[looser]['challonge'])
                             continue
 
+                        looser, looser_last_activity = actifs[1]
+
                         if winner_last_activity - looser_last_activity > datetime.timedelta(minutes = 10): # Si différence d'inactivité de plus de 10 minutes
-                            await gaming_channel.send(f"<@&{to_id}> **Une DQ automatique a été executée pour inactivité :**\n-<@{winner.id}> passe au round suivant.\n-<@{looser.id}> est DQ du tournoi.")
-                            await async_http_retry(achallonge.participants.destroy, tournoi["id"], participants[looser.id]['challonge'])
+                            outbox.send(gaming_channel, f"<@&{to_id}> **Une DQ automatique a été executée pour inactivité :**\n-<@{winner}> passe au round suivant.\n-<@{looser}> est DQ du tournoi.")
+                            await async_http_retry(achallonge.participants.destroy, tournoi["id"], participants[looser]['challonge'])
 
                         else: # Si pas de différence notable, demander une décision manuelle
-                            await gaming_channel.send(f"<@&{to_id}> **Durée anormalement longue détectée** pour ce set, une décision d'un TO doit être prise")
+                            outbox.send(gaming_channel, f"<@&{to_id}> **Durée anormalement longue détectée** pour ce set, une décision d'un TO doit être prise")
 
-                        await bot.get_channel(to_channel_id).send(f":information_source: Le set du channel <#{gaming_channel.id}> prend anormalement du temps, une intervention est peut-être nécessaire.")
+                        outbox.send(bot.get_channel(to_channel_id), f":information_source: Le set du channel <#{gaming_channel.id}> prend anormalement du temps, une intervention est peut-être nécessaire.")
 
 
 ### Obtenir stagelist
 @bot.command(name='stages', aliases=['stage', 'stagelist', 'ban', 'bans', 'map', 'maps'])
 @commands.check(tournament_is_underway_or_pending)
 async def get_stagelist(ctx):
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
-    with open(gamelist_path, 'r+') as f: gamelist = yaml.full_load(f)
+    tournoi = get_tournoi()
+    gamelist = get_gamelist()
 
     msg = f":map: **Stages légaux pour {tournoi['game']} :**\n:white_small_square: __Starters__ :\n"
-    for stage in gamelist[tournoi['game']]['starters']: msg += f"- {stage}\n"
+    for stage in gamelist[tournoi['game']].starters: msg += f"- {stage}\n"
 
-    if 'counterpicks' in gamelist[tournoi['game']]:
+    if gamelist[tournoi['game']].counterpicks:
         msg += ":white_small_square: __Counterpicks__ :\n"
-        for stage in gamelist[tournoi['game']]['counterpicks']: msg += f"- {stage}\n"
+        for stage in gamelist[tournoi['game']].counterpicks: msg += f"- {stage}\n"
 
     await ctx.send(msg)
 
@@ -1485,9 +1857,9 @@ async def get_stagelist(ctx):
 @bot.command(name='ruleset', aliases=['rules'])
 @commands.check(tournament_is_underway_or_pending)
 async def get_ruleset(ctx):
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
-    with open(gamelist_path, 'r+') as f: gamelist = yaml.full_load(f)
-    await ctx.send(f"<@{ctx.author.id}> Le ruleset est disponible ici : <#{gamelist[tournoi['game']]['ruleset']}>")
+    tournoi = get_tournoi()
+    gamelist = get_gamelist()
+    await ctx.send(f"<@{ctx.author.id}> Le ruleset est disponible ici : <#{gamelist[tournoi['game']].ruleset}>")
 
 
 ### Lag
@@ -1496,13 +1868,13 @@ async def get_ruleset(ctx):
 @in_combat_channel()
 @commands.cooldown(1, 120, type=commands.BucketType.channel)
 async def send_lag_text(ctx):
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
-    with open(gamelist_path, 'r+') as f: gamelist = yaml.full_load(f)
+    tournoi = get_tournoi()
+    gamelist = get_gamelist()
 
     msg = lag_text
 
     if tournoi['game'] == 'Project+':
-        msg += (f"\n{gamelist[tournoi['game']]['icon']} **Spécificités Project+ :**\n"
+        msg += (f"\n{gamelist[tournoi['game']].icon} **Spécificités Project+ :**\n"
                 f":white_small_square: Vérifier que le PC fait tourner le jeu de __manière fluide (60 FPS constants)__, sinon :\n"
                 f"- Baisser la résolution interne dans les paramètres graphiques.\n"
                 f"- Désactiver les textures HD, l'anti-aliasing, s'ils ont été activés.\n"
@@ -1530,8 +1902,8 @@ async def calculate_buffer(ctx, arg: int):
 ### Annoncer les résultats
 async def annonce_resultats():
 
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
-    with open(gamelist_path, 'r+') as f: gamelist = yaml.full_load(f)
+    tournoi = get_tournoi()
+    gamelist = get_gamelist()
 
     participants, resultats = await async_http_retry(achallonge.participants.index, tournoi["id"]), []
 
@@ -1561,7 +1933,7 @@ async def annonce_resultats():
                   f":reminder_ribbon: **5e** : {top6}\n"
                   f":reminder_ribbon: **7e** : {top8}\n\n"
                   f":bar_chart: {len(participants)} entrants\n"
-                  f"{gamelist[tournoi['game']]['icon']} {tournoi['game']}\n"
+                  f"{gamelist[tournoi['game']].icon} {tournoi['game']}\n"
                   f":link: **Bracket :** {tournoi['url']}\n\n"
                   f"{ending}")
     
@@ -1570,12 +1942,12 @@ async def annonce_resultats():
 
 ### Ajouter un rôle
 async def attribution_role(event):
-    with open(gamelist_path, 'r+') as f: gamelist = yaml.full_load(f)
+    gamelist = get_gamelist()
 
     for game in gamelist:
 
-        if event.emoji.name == re.search(r'\:(.*?)\:', gamelist[game]['icon']).group(1):
-            role = event.member.guild.get_role(gamelist[game]['role'])
+        if event.emoji.name == gamelist[game].emoji:
+            role = event.member.guild.get_role(gamelist[game].role)
 
             try:
                 await event.member.add_roles(role)
@@ -1583,8 +1955,8 @@ async def attribution_role(event):
             except (discord.HTTPException, discord.Forbidden):
                 pass
 
-        elif event.emoji.name == gamelist[game]['icon_1v1']:
-            role = event.member.guild.get_role(gamelist[game]['role_1v1'])
+        elif event.emoji.name == gamelist[game].icon_1v1:
+            role = event.member.guild.get_role(gamelist[game].role_1v1)
 
             try:
                 await event.member.add_roles(role)
@@ -1595,14 +1967,14 @@ async def attribution_role(event):
 
 ### Enlever un rôle
 async def retirer_role(event):
-    with open(gamelist_path, 'r+') as f: gamelist = yaml.full_load(f)
+    gamelist = get_gamelist()
 
     guild = bot.get_guild(id=guild_id) # due to event.member not being available
 
     for game in gamelist:
 
-        if event.emoji.name == re.search(r'\:(.*?)\:', gamelist[game]['icon']).group(1):
-            role, member = guild.get_role(gamelist[game]['role']), guild.get_member(event.user_id)
+        if event.emoji.name == gamelist[game].emoji:
+            role, member = guild.get_role(gamelist[game].role), guild.get_member(event.user_id)
 
             try:
                 await member.remove_roles(role)
@@ -1610,8 +1982,8 @@ async def retirer_role(event):
             except (discord.HTTPException, discord.Forbidden):
                 pass
 
-        elif event.emoji.name == gamelist[game]['icon_1v1']:
-            role, member = guild.get_role(gamelist[game]['role_1v1']), guild.get_member(event.user_id)
+        elif event.emoji.name == gamelist[game].icon_1v1:
+            role, member = guild.get_role(gamelist[game].role_1v1), guild.get_member(event.user_id)
 
             try:
                 await member.remove_roles(role)
@@ -1627,10 +1999,10 @@ async def on_raw_reaction_add(event):
 
     elif (event.emoji.name == "✅") and (event.channel_id == inscriptions_channel_id):
 
-        with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+        tournoi = get_tournoi()
 
         if tournoi["reaction_mode"] and event.message_id == tournoi["annonce_id"]:
-            await inscrire(event.member) # available for REACTION_ADD only
+            registrations.push(event.member, "in", appliquer_reactions) # available for REACTION_ADD only
 
     elif (manage_game_roles == True) and (event.channel_id == roles_channel_id):
         await attribution_role(event)
@@ -1643,15 +2015,32 @@ async def on_raw_reaction_remove(event):
 
     elif (event.emoji.name == "✅") and (event.channel_id == inscriptions_channel_id):
 
-        with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+        tournoi = get_tournoi()
 
         if tournoi["reaction_mode"] and event.message_id == tournoi["annonce_id"]:
-            await desinscrire(bot.get_guild(id=guild_id).get_member(event.user_id)) # event.member not available for REACTION_REMOVE
+            registrations.push(bot.get_guild(id=guild_id).get_member(event.user_id), "out", appliquer_reactions) # event.member not available for REACTION_REMOVE
 
     elif (manage_game_roles == True) and (event.channel_id == roles_channel_id):
         await retirer_role(event)
 
 
+### Activité des channels de set, suivie au fil des messages
+@bot.listen('on_message')
+async def track_activity(message):
+    channel = message.channel
+    if isinstance(channel, discord.TextChannel) and channel.category != None and channel.category.name.lower() in SIDES and channel.name != POOL_NAME:
+        activity.record(message)
+
+async def watch_channel(channel):
+    if channel.id not in activity.tracked: # channel not watched since the restart
+        await activity.backfill(channel)
+
+def is_player(guild, author_id):
+    if author_id == bot.user.id: return False
+    member = guild.get_member(author_id)
+    return member == None or to_id not in [y.id for y in member.roles]
+
+
 ### Help message
 @bot.command(name='help', aliases=['info', 'version'])
 @commands.cooldown(1, 30, type=commands.BucketType.user)
@@ -1667,7 +2056,7 @@ async def send_help(ctx):
 @bot.command(name='set', aliases=['turn'])
 @commands.check(is_owner_or_to)
 async def set_preference(ctx, arg1, arg2):
-    with open(preferences_path, 'r+') as f: preferences = yaml.full_load(f)
+    preferences = dict(get_preferences())
 
     try:
         if isinstance(preferences[arg1.lower()], bool):
@@ -1689,7 +2078,7 @@ async def set_preference(ctx, arg1, arg2):
         await ctx.send(f"<@{ctx.author.id}> **Valeur incorrecte :** `{arg2}`.")
 
     else:
-        with open(preferences_path, 'w') as f: yaml.dump(preferences, f)
+        dump_preferences(preferences)
         await ctx.message.add_reaction("✅")
         await ctx.send(f"<@{ctx.author.id}> **Paramètre changé :** `{arg1} = {arg2}`.")
 
@@ -1698,7 +2087,7 @@ async def set_preference(ctx, arg1, arg2):
 @bot.command(name='settings', aliases=['preferences', 'config'])
 @commands.check(is_owner_or_to)
 async def check_settings(ctx):
-    with open(preferences_path, 'r+') as f: preferences = yaml.full_load(f)
+    preferences = get_preferences()
 
     parametres = ""
     for parametre in preferences:
@@ -0,0 +1,26 @@
+import atexit, os, shutil, sys, tempfile, yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+### The modules read config/ and data/ relative to the working directory : the tests run in a copy,
+### with placeholder Discord ids since the shipped config leaves them empty
+def fill_ids(section):
+    for key, value in section.items():
+        if isinstance(value, dict):
+            fill_ids(section[key])
+        elif value is None:
+            section[key] = 0
+
+workdir = tempfile.mkdtemp(prefix="atos-tests-")
+atexit.register(shutil.rmtree, workdir, True)
+
+shutil.copytree(os.path.join(ROOT, "config"), os.path.join(workdir, "config"))
+shutil.copytree(os.path.join(ROOT, "data"), os.path.join(workdir, "data"), ignore=shutil.ignore_patterns("*.db", "*.db-*", "*.journal"))
+
+with open(os.path.join(workdir, "config", "config.yml"), 'r') as f: config = yaml.safe_load(f)
+fill_ids(config["discord"])
+with open(os.path.join(workdir, "config", "config.yml"), 'w') as f: yaml.dump(config, f)
+
+os.chdir(workdir)
@@ -0,0 +1,52 @@
+import asyncio, datetime
+
+from utils.activity import ActivityTracker
+
+
+class Object:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def message(channel_id, author_id, minute):
+    return Object(channel=Object(id=channel_id), author=Object(id=author_id), created_at=datetime.datetime(2020, 7, 4, 20, minute))
+
+
+def test_record_keeps_the_latest_times():
+    activity = ActivityTracker()
+
+    for msg in [message(1, 10, 5), message(1, 20, 7), message(1, 10, 3)]:
+        activity.record(msg)
+
+    assert activity.last_message[1] == datetime.datetime(2020, 7, 4, 20, 7)
+    assert activity.latest_authors(1) == [(20, datetime.datetime(2020, 7, 4, 20, 7)), (10, datetime.datetime(2020, 7, 4, 20, 5))]
+    assert activity.has_spoken(1, 10) and not activity.has_spoken(1, 30)
+
+
+def test_start_and_forget():
+    activity = ActivityTracker()
+    activity.record(message(1, 10, 5))
+
+    activity.start(1)
+    assert 1 in activity.tracked and not activity.has_spoken(1, 10)
+
+    activity.forget(1)
+    assert 1 not in activity.tracked and activity.latest_authors(1) == []
+
+
+def test_backfill_tracks_only_a_full_history():
+    activity = ActivityTracker()
+    history = [message(1, 10, 5), message(1, 20, 6)]
+
+    def read(limit=None):
+        async def messages():
+            for msg in history[:limit]: yield msg
+        return messages()
+
+    channel = Object(id=1, history=read)
+
+    asyncio.run(activity.backfill(channel, limit=1))
+    assert 1 not in activity.tracked and activity.has_spoken(1, 10)
+
+    asyncio.run(activity.backfill(channel))
+    assert 1 in activity.tracked and activity.has_spoken(1, 20)
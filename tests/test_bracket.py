@@ -0,0 +1,142 @@
+from utils.bracket import BracketSnapshot, BracketModel, MatchOpened, MatchUnderway, MatchUnmarked, MatchCompleted, MatchReopened
+
+
+def match(match_id, underway_at=None):
+    return {"id": match_id, "suggested_play_order": match_id, "underway_at": underway_at}
+
+
+def kinds(events):
+    return [(type(event), event.match["id"]) for event in events]
+
+
+def test_opened_then_underway_then_completed():
+    snapshot = BracketSnapshot()
+
+    assert kinds(snapshot.update([match(1), match(2)])) == [(MatchOpened, 1), (MatchOpened, 2)]
+    assert set(snapshot.waiting) == {1, 2} and snapshot.underway == {}
+
+    assert kinds(snapshot.update([match(1, "t"), match(2)])) == [(MatchUnderway, 1)]
+    assert set(snapshot.waiting) == {2} and set(snapshot.underway) == {1}
+
+    assert kinds(snapshot.update([match(2)])) == [(MatchCompleted, 1)]
+    assert set(snapshot.waiting) == {2} and snapshot.underway == {}
+    assert not snapshot.is_open(1) and snapshot.get(2)["id"] == 2
+
+
+def test_no_event_when_nothing_changed():
+    snapshot = BracketSnapshot()
+    snapshot.update([match(1, "t")])
+
+    assert snapshot.update([match(1, "t")]) == []
+    assert snapshot.polls == 2
+
+
+def test_already_underway_when_first_seen():
+    snapshot = BracketSnapshot()
+
+    assert kinds(snapshot.update([match(1, "t")])) == [(MatchOpened, 1), (MatchUnderway, 1)]
+    assert snapshot.waiting == {} and set(snapshot.underway) == {1}
+
+
+def test_unmarked_match_goes_back_to_waiting():
+    snapshot = BracketSnapshot()
+    snapshot.update([match(1)])
+    snapshot.update([match(1, "t")])
+
+    assert kinds(snapshot.update([match(1)])) == [(MatchUnmarked, 1)]
+    assert set(snapshot.waiting) == {1} and snapshot.underway == {}
+
+
+def test_reopened_match():
+    snapshot = BracketSnapshot()
+    snapshot.update([match(1, "t")])
+    snapshot.update([])
+
+    assert kinds(snapshot.update([match(1)])) == [(MatchReopened, 1)]
+    assert set(snapshot.waiting) == {1}
+
+
+def test_waiting_holds_the_latest_state():
+    snapshot = BracketSnapshot()
+    snapshot.update([match(1)])
+
+    latest = dict(match(1), player1_id=10)
+    snapshot.update([latest])
+
+    assert snapshot.waiting[1] is latest
+
+
+### BracketModel : two winners round 1 sets, feeding winners round 2 and losers round 1
+def bracket():
+    def set_(match_id, round_, player1=None, player2=None, prereqs=(None, None), loser=False, state="pending"):
+        return {
+            "id": match_id, "suggested_play_order": match_id, "round": round_, "state": state, "underway_at": None,
+            "player1_id": player1, "player2_id": player2,
+            "player1_prereq_match_id": prereqs[0], "player2_prereq_match_id": prereqs[1],
+            "player1_is_prereq_match_loser": loser, "player2_is_prereq_match_loser": loser
+        }
+
+    return [
+        set_(1, 1, 10, 20, state="open"),
+        set_(2, 1, 30, 40, state="open"),
+        set_(3, 2, prereqs=(1, 2)),
+        set_(4, -1, prereqs=(1, 2), loser=True)
+    ]
+
+
+def test_report_moves_both_players_forward():
+    model = BracketModel()
+    model.build(bracket())
+
+    model.report(1, 10)
+    assert model.matches[1]["state"] == "complete" and model.matches[1]["loser_id"] == 20
+    assert model.matches[3]["player1_id"] == 10 and model.matches[3]["state"] == "pending"
+    assert model.matches[4]["player1_id"] == 20
+
+    model.report(2, 40)
+    assert (model.matches[3]["player2_id"], model.matches[3]["state"]) == (40, "open")
+    assert (model.matches[4]["player2_id"], model.matches[4]["state"]) == (30, "open")
+    assert model.get_active(1) is None and model.get_active(3)["id"] == 3
+    assert model.not_underway() == {3, 4}
+
+
+def test_report_ignores_unknown_winner():
+    model = BracketModel()
+    model.build(bracket())
+
+    model.report(1, 30)
+    assert model.matches[1]["state"] == "open"
+
+
+def test_build_keeps_its_own_copies():
+    matches = bracket()
+    model = BracketModel()
+    model.build(matches)
+
+    model.report(1, 10)
+    assert matches[0]["state"] == "open"
+
+
+def test_reconcile_agrees_with_the_poll():
+    model = BracketModel()
+    model.build(bracket())
+    model.report(1, 10)
+    model.report(2, 40)
+
+    poll = [dict(model.matches[3]), dict(model.matches[4])]
+    assert not model.reconcile(poll)
+
+
+def test_reconcile_detects_a_set_reported_elsewhere():
+    model = BracketModel()
+    model.build(bracket())
+
+    assert model.reconcile([dict(bracket()[1])]) # set 1 isn't open anymore
+
+
+def test_reconcile_detects_a_reopened_set():
+    model = BracketModel()
+    model.build(bracket())
+    model.report(1, 10)
+
+    assert model.reconcile([dict(bracket()[0]), dict(bracket()[1])])
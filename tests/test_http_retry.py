@@ -0,0 +1,169 @@
+import asyncio, pytest
+
+from achallonge import ChallongeException
+from utils import http_retry
+from utils.http_retry import ReadCoalescer, CircuitBreaker, RetryBudget, retry_request
+from utils.http_session import ChallongeHTTPError
+
+
+def test_identical_reads_share_one_request():
+    cache = ReadCoalescer(ttl=5)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return [{"id": 1}]
+
+    async def main():
+        results = await asyncio.gather(*[cache.get("matches", fetch) for _ in range(3)])
+        results.append(await cache.get("matches", fetch))
+        return results
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(result == [{"id": 1}] for result in results)
+    assert cache.stats() == {"hits": 1, "coalesced": 2, "misses": 1}
+
+
+def test_each_caller_gets_its_own_copy():
+    cache = ReadCoalescer(ttl=5)
+
+    async def fetch():
+        return [{"id": 1, "state": "open"}]
+
+    async def main():
+        first = await cache.get("matches", fetch)
+        first[0]["state"] = "complete"
+        first.append({"id": 2})
+        return await cache.get("matches", fetch)
+
+    assert asyncio.run(main()) == [{"id": 1, "state": "open"}]
+
+
+def test_a_write_invalidates_the_reads():
+    cache = ReadCoalescer(ttl=5)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {"id": 1}
+
+    async def main():
+        await cache.get("tournament", fetch)
+        cache.invalidate()
+        await cache.get("tournament", fetch)
+
+    asyncio.run(main())
+
+    assert len(calls) == 2
+
+
+### Circuit breaker and retries
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(http_retry, "time", clock)
+    return clock
+
+
+def test_breaker_opens_after_failures_in_a_row(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+
+    for _ in range(2): breaker.failure()
+    breaker.success()
+    for _ in range(2): breaker.failure()
+    assert breaker.allow()
+
+    breaker.failure()
+    assert not breaker.allow()
+    assert breaker.trips == 1
+
+
+def test_breaker_half_open_lets_a_single_probe_through(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.failure()
+
+    clock.now += 29
+    assert not breaker.allow()
+
+    clock.now += 1
+    assert breaker.allow() # the probe
+    assert not breaker.allow() # everyone else waits for it
+
+    breaker.success()
+    assert breaker.allow() and breaker.opened_at is None
+
+
+def test_failed_probe_opens_the_breaker_again(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.failure()
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.failure()
+
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.trips == 1
+
+
+def test_retry_budget_is_paid_for_by_requests():
+    budget = RetryBudget()
+
+    while budget.withdraw(): pass
+    assert not budget.withdraw()
+
+    for _ in range(5): budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+
+@pytest.fixture
+def fresh_retries(monkeypatch):
+    monkeypatch.setattr(http_retry, "breaker", CircuitBreaker(http_retry.BREAKER_THRESHOLD, http_retry.BREAKER_COOLDOWN))
+    monkeypatch.setattr(http_retry, "BACKOFF_BASE", 0)
+
+
+def test_transient_errors_are_retried(fresh_retries):
+    answers = [ChallongeHTTPError(503, "Service Unavailable"), ChallongeHTTPError(502, "Bad Gateway"), ["ok"]]
+
+    async def show(*args):
+        answer = answers.pop(0)
+        if isinstance(answer, Exception): raise answer
+        return answer
+
+    assert asyncio.run(retry_request(show, 1)) == ["ok"]
+    assert answers == []
+
+
+def test_other_errors_are_not_retried(fresh_retries):
+    calls = []
+
+    async def destroy(*args):
+        calls.append(args)
+        raise ChallongeHTTPError(404, "Not Found")
+
+    with pytest.raises(ChallongeHTTPError):
+        asyncio.run(retry_request(destroy, 1, 2))
+    assert len(calls) == 1
+
+
+def test_open_breaker_fails_fast(fresh_retries):
+    for _ in range(http_retry.BREAKER_THRESHOLD): http_retry.breaker.failure()
+
+    async def show(*args):
+        raise AssertionError("not sent")
+
+    with pytest.raises(ChallongeException):
+        asyncio.run(retry_request(show, 1))
@@ -0,0 +1,94 @@
+import asyncio
+
+from utils.journal import Journal, snapshot_hash
+
+
+def lines(path):
+    return path.read_text().splitlines()
+
+
+def test_records_are_replayed_on_the_same_snapshot(tmp_path):
+    path = tmp_path / "participants.json.journal"
+    base = snapshot_hash(b"{}")
+
+    async def write():
+        journal = Journal(str(path))
+        assert journal.open(base) == []
+        journal.append({"op": "in", "id": 1, "data": {}})
+        await journal.append({"op": "out", "id": 1})
+        journal.close()
+
+    asyncio.run(write())
+
+    journal = Journal(str(path))
+    assert journal.open(base) == [{"op": "in", "id": 1, "data": {}}, {"op": "out", "id": 1}]
+    assert journal.count == 2
+    journal.close()
+
+
+def test_records_of_another_snapshot_are_discarded(tmp_path):
+    path = tmp_path / "participants.json.journal"
+    path.write_text('{"base":"old"}\n{"op":"out","id":1}\n')
+
+    journal = Journal(str(path))
+    assert journal.open("new") == []
+    journal.close()
+
+    assert lines(path) == ['{"base":"new"}']
+
+
+def test_torn_header_is_discarded(tmp_path):
+    path = tmp_path / "participants.json.journal"
+    path.write_text('{"ba')
+
+    journal = Journal(str(path))
+    assert journal.open("new") == []
+    journal.close()
+
+    assert lines(path) == ['{"base":"new"}']
+
+
+def test_replay_stops_at_a_truncated_record(tmp_path):
+    path = tmp_path / "participants.json.journal"
+    path.write_text('{"base":"h"}\n{"op":"out","id":1}\n{"op":"in","id"')
+
+    journal = Journal(str(path))
+    assert journal.open("h") == [{"op": "out", "id": 1}]
+    journal.close()
+
+    assert lines(path) == ['{"base":"h"}', '{"op":"out","id":1}']
+
+
+def test_appends_share_one_commit(tmp_path):
+    path = tmp_path / "participants.json.journal"
+
+    async def write():
+        journal = Journal(str(path))
+        journal.open("h")
+        first = journal.append({"op": "check_in", "id": 1})
+        second = journal.append({"op": "check_in", "id": 2})
+        assert first is second
+        await first
+        assert journal.pending is None
+        journal.close()
+
+    asyncio.run(write())
+
+    assert len(lines(path)) == 3
+
+
+def test_reset_resolves_pending_records(tmp_path):
+    path = tmp_path / "participants.json.journal"
+
+    async def write():
+        journal = Journal(str(path))
+        journal.open("h")
+        pending = journal.append({"op": "check_in", "id": 1})
+        journal.reset("compacted")
+        assert pending.done() and pending.exception() is None
+        assert journal.count == 0
+        journal.close()
+
+    asyncio.run(write())
+
+    assert lines(path) == ['{"base":"compacted"}']
@@ -0,0 +1,52 @@
+import asyncio
+
+from utils.outbox import Outbox, PAGE_LENGTH
+
+
+class Channel:
+    id = 1
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content):
+        self.sent.append(content)
+
+
+def test_queued_messages_are_merged_in_order():
+    outbox, channel = Outbox(rate=100, burst=5), Channel()
+
+    async def main():
+        for i in range(3): outbox.send(channel, f"message {i}")
+        await outbox.flush()
+
+    asyncio.run(main())
+
+    assert channel.sent == ["message 0\nmessage 1\nmessage 2"]
+    assert outbox.stats()["delivered"] == 3 and outbox.stats()["queued"] == 0
+
+
+def test_parts_of_one_send_stay_on_the_same_page():
+    pages = Outbox.paginate(["a" * 1500, "b" * 300 + "\n" + "c" * 300])
+    assert pages == ["a" * 1500, "b" * 300 + "\n" + "c" * 300]
+
+
+def test_only_a_message_longer_than_a_page_is_split():
+    long = "\n".join(["x" * 100] * 50)
+    pages = Outbox.paginate(["short", long, "after"])
+
+    assert pages[0] == "short"
+    assert all(len(page) <= PAGE_LENGTH for page in pages)
+    assert "".join(pages[1:]).replace("\n", "") == ("x" * 100 * 50) + "after"
+
+
+def test_mass_mentions_are_kept():
+    outbox, channel = Outbox(rate=100, burst=5), Channel()
+
+    async def main():
+        outbox.send(channel, "@everyone", "", "le tournoi commence")
+        await outbox.flush()
+
+    asyncio.run(main())
+
+    assert channel.sent == ["@everyone\nle tournoi commence"]
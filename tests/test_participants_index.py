@@ -0,0 +1,49 @@
+import pytest
+
+from utils.json_stream import participants, ParticipantsIndex
+
+
+@pytest.fixture
+def index():
+    participants.clear()
+    participants.update({
+        1: {"display_name": "Pit", "challonge": 101},
+        2: {"display_name": "Pit"},
+        3: {"display_name": "Ness", "challonge": 103}
+    })
+    index = ParticipantsIndex()
+    index.rebuild()
+    yield index
+    participants.clear()
+
+
+def test_lookup_by_challonge_id(index):
+    assert index.discord_id(101) == 1
+    assert index.discord_id(999) is None
+    assert index.display_name(103) == "Ness"
+    assert index.display_name(999, default="?") == "?"
+
+
+def test_homonyms_not_on_challonge_yet_come_first(index):
+    assert index.discord_id_by_name("Pit") == 2
+    assert index.discord_id_by_name("Ness") == 3
+    assert index.discord_id_by_name("Lucas") is None
+
+
+def test_remove_keeps_the_other_homonyms(index):
+    index.remove(2)
+    del participants[2]
+    assert index.discord_id_by_name("Pit") == 1
+
+    index.remove(1)
+    del participants[1]
+    assert index.discord_id_by_name("Pit") is None
+    assert index.discord_id(101) is None
+
+
+def test_add_after_challonge_creation(index):
+    participants[2]["challonge"] = 102
+    index.add(2)
+
+    assert index.discord_id(102) == 2
+    assert index.by_name["Pit"] == [1, 2]
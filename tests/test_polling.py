@@ -0,0 +1,35 @@
+from utils.get_config import poll_fast, poll_normal, poll_idle
+from utils.polling import AdaptivePolling, FAST_POLLS, IDLE_AFTER
+
+
+def test_fast_after_events_then_back_to_normal():
+    polling = AdaptivePolling()
+
+    assert polling.next_interval(["opened"]) == poll_fast
+    for _ in range(FAST_POLLS - 1):
+        assert polling.next_interval([]) == poll_fast
+    assert polling.next_interval([]) == poll_normal
+
+
+def test_idle_when_nothing_happens():
+    polling = AdaptivePolling()
+
+    for _ in range(IDLE_AFTER - 1):
+        assert polling.next_interval([]) == poll_normal
+    assert polling.next_interval([]) == poll_idle
+
+
+def test_score_report_speeds_polling_up():
+    polling = AdaptivePolling()
+    for _ in range(IDLE_AFTER): polling.next_interval([])
+
+    polling.report()
+    assert polling.next_interval([]) == poll_fast
+    assert polling.reports == 0
+
+
+def test_backlog_keeps_polling_fast():
+    polling = AdaptivePolling()
+
+    for _ in range(FAST_POLLS + 2):
+        assert polling.next_interval([], backlog=True) == poll_fast
@@ -0,0 +1,49 @@
+import asyncio
+
+from utils.rate_limit import RateLimiter, SCORE, WRITE, READ
+
+
+def served_order(requests, rate=100, burst=1):
+    limiter = RateLimiter(rate, burst)
+    order = []
+
+    async def request(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+
+    async def main():
+        await limiter.acquire() # empty bucket : everyone below has to queue
+        await asyncio.gather(*[request(name, priority) for name, priority in requests])
+
+    asyncio.run(main())
+    return order, limiter
+
+
+def test_served_by_priority_class():
+    order, _ = served_order([("read", READ), ("write", WRITE), ("score", SCORE)])
+    assert order == ["score", "write", "read"]
+
+
+def test_same_class_is_served_in_arrival_order():
+    order, _ = served_order([("read 1", READ), ("score 1", SCORE), ("read 2", READ), ("score 2", SCORE)])
+    assert order == ["score 1", "score 2", "read 1", "read 2"]
+
+
+def test_burst_is_served_without_waiting():
+    limiter = RateLimiter(rate=1, burst=3)
+
+    async def main():
+        for _ in range(3): await asyncio.wait_for(limiter.acquire(), 0.1)
+
+    asyncio.run(main())
+    assert all(stats["waited"] == 0 for stats in limiter.stats().values())
+
+
+def test_queue_statistics():
+    _, limiter = served_order([("read 1", READ), ("read 2", READ), ("score", SCORE)])
+    stats = limiter.stats()
+
+    assert stats["read"]["waited"] == 2 and stats["read"]["max_queued"] == 2
+    assert stats["score"]["waited"] == 1
+    assert all(x["queued"] == 0 for x in stats.values())
+    assert stats["read"]["wait_time"] > stats["score"]["wait_time"]
@@ -0,0 +1,95 @@
+import asyncio, datetime, time
+
+from utils.registration import RegistrationQueue
+
+
+class Member:
+    def __init__(self, id):
+        self.id = id
+
+
+def run_batches(pushes, delay=0.01, close=False):
+    queue, batches = RegistrationQueue(delay, workers=2), []
+
+    async def process(batch):
+        batches.append([(member.id, op) for member, op, _ in batch])
+
+    async def main():
+        for member, op in pushes: queue.push(member, op, process)
+        if close: queue.close()
+        await queue.flush()
+
+    asyncio.run(main())
+    return queue, batches
+
+
+def test_last_change_of_a_member_wins():
+    alice, bob = Member(1), Member(2)
+    queue, batches = run_batches([(alice, "in"), (bob, "in"), (alice, "out"), (alice, "in"), (bob, "out")])
+
+    assert batches == [[(1, "in"), (2, "out")]]
+    assert queue.stats()["received"] == 5 and queue.stats()["batches"] == 1
+
+
+def test_members_who_left_are_ignored():
+    _, batches = run_batches([(None, "out"), (Member(1), "in")])
+    assert batches == [[(1, "in")]]
+
+
+def test_changes_are_stamped_when_received():
+    queue, stamps = RegistrationQueue(0.05, workers=2), []
+
+    async def process(batch):
+        stamps.extend(received for _, _, received in batch)
+
+    async def main():
+        before = datetime.datetime.now()
+        queue.push(Member(1), "in", process)
+        await queue.flush()
+        return before
+
+    before = asyncio.run(main())
+    assert before <= stamps[0] <= before + datetime.timedelta(seconds=0.04)
+
+
+def test_flush_does_not_wait_for_the_delay():
+    start = time.monotonic()
+    _, batches = run_batches([(Member(1), "in")], delay=10, close=True)
+
+    assert batches == [[(1, "in")]]
+    assert time.monotonic() - start < 1
+
+
+def test_closed_queue_ignores_new_changes():
+    queue, batches = RegistrationQueue(0.01, workers=2), []
+
+    async def process(batch):
+        batches.append(batch)
+
+    async def main():
+        queue.close()
+        queue.push(Member(1), "in", process)
+        await queue.flush()
+        queue.clear() # next tournament
+        queue.push(Member(2), "in", process)
+        await queue.flush()
+
+    asyncio.run(main())
+    assert [[member.id for member, _, _ in batch] for batch in batches] == [[2]]
+
+
+def test_background_jobs_are_bounded():
+    queue, running, peak = RegistrationQueue(0.01, workers=2), [0], [0]
+
+    async def job():
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+
+    async def main():
+        for _ in range(6): queue.background(job())
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert peak[0] == 2 and queue.stats()["jobs"] == 6
@@ -0,0 +1,41 @@
+from utils.rounds import compute_round_info, build_round_table, RoundInfo
+
+
+# 4 winners rounds + grand final, 7 losers rounds
+TOURNOI = {
+    "round_winner_top8": 3,
+    "round_looser_top8": -4,
+    "round_winner_bo5": 4,
+    "round_looser_bo5": -6,
+    "full_bo3": False,
+    "full_bo5": False
+}
+
+
+def test_winners_rounds():
+    assert compute_round_info(TOURNOI, 1) == RoundInfo("Winners Round 1", False, False)
+    assert compute_round_info(TOURNOI, 2) == RoundInfo("Winners Quarter-Final", False, False)
+    assert compute_round_info(TOURNOI, 3) == RoundInfo("Winners Semi-Final", True, False)
+    assert compute_round_info(TOURNOI, 4) == RoundInfo("Winners Final", True, True)
+    assert compute_round_info(TOURNOI, 5) == RoundInfo("Grand Final", True, True)
+
+
+def test_losers_rounds():
+    assert compute_round_info(TOURNOI, -1) == RoundInfo("Losers Round 1", False, False)
+    assert compute_round_info(TOURNOI, -4) == RoundInfo("Losers Round 4", True, False)
+    assert compute_round_info(TOURNOI, -5) == RoundInfo("Losers Quarter-Final", True, False)
+    assert compute_round_info(TOURNOI, -6) == RoundInfo("Losers Semi-Final", True, True)
+    assert compute_round_info(TOURNOI, -7) == RoundInfo("Losers Final", True, True)
+
+
+def test_full_bo3_and_full_bo5():
+    assert not compute_round_info(dict(TOURNOI, full_bo3=True), 5).bo5
+    assert compute_round_info(dict(TOURNOI, full_bo5=True), 1).bo5
+
+
+def test_round_table_is_stored_with_the_tournament():
+    tournoi = dict(TOURNOI)
+    build_round_table(tournoi, [1, 1, -1, 5])
+
+    assert list(tournoi["rounds"]) == ["-1", "1", "5"]
+    assert RoundInfo(*tournoi["rounds"]["5"]) == compute_round_info(TOURNOI, 5)
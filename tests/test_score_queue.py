@@ -0,0 +1,66 @@
+import asyncio
+
+from utils.score_queue import ScoreQueue
+
+
+def test_reports_of_one_set_run_one_at_a_time():
+    queue, log = ScoreQueue(workers=4), []
+
+    async def report(name, match_id):
+        async with queue.lock(match_id):
+            log.append(f"start {name}")
+            await asyncio.sleep(0.01)
+            log.append(f"end {name}")
+
+    async def on_error():
+        pass
+
+    async def main():
+        for name in ["a", "b"]: queue.submit(report(name, 1), on_error)
+        await queue.queue.join()
+        queue.clear()
+
+    asyncio.run(main())
+    assert log == ["start a", "end a", "start b", "end b"]
+
+
+def test_failed_report_calls_on_error():
+    queue, errors = ScoreQueue(workers=1), []
+
+    async def report():
+        raise RuntimeError("Challonge down")
+
+    async def on_error():
+        errors.append(1)
+
+    async def main():
+        queue.submit(report(), on_error)
+        await queue.queue.join()
+        stats = queue.stats()
+        queue.clear()
+        return stats
+
+    assert asyncio.run(main())["processed"] == 1
+    assert errors == [1]
+
+
+def test_clear_stops_the_workers():
+    queue = ScoreQueue(workers=2)
+
+    async def report():
+        await asyncio.sleep(10)
+
+    async def on_error():
+        pass
+
+    async def main():
+        for _ in range(3): queue.submit(report(), on_error)
+        await asyncio.sleep(0)
+        workers = list(queue.tasks)
+        queue.clear()
+        await asyncio.sleep(0)
+        return workers
+
+    workers = asyncio.run(main())
+    assert all(worker.cancelled() for worker in workers)
+    assert queue.stats()["queued"] == 0 and queue.stats()["workers"] == 0
@@ -0,0 +1,69 @@
+import datetime, json
+
+from utils.sqlite_store import SQLiteStore
+
+
+def open_store(tmp_path):
+    return SQLiteStore(str(tmp_path / "atos.db"))
+
+
+def test_save_only_writes_changed_rows(tmp_path):
+    store = open_store(tmp_path)
+    table = store.participants
+    table.load()
+
+    table.save({1: {"display_name": "a"}, 2: {"display_name": "b"}})
+    before = store.conn.total_changes
+
+    table.save({1: {"display_name": "a"}, 2: {"display_name": "c"}})
+    assert store.conn.total_changes - before == 1
+
+    before = store.conn.total_changes
+    table.save({1: {"display_name": "a"}, 2: {"display_name": "c"}})
+    assert store.conn.total_changes == before
+
+
+def test_save_deletes_removed_keys(tmp_path):
+    store = open_store(tmp_path)
+    table = store.participants
+    table.load()
+
+    table.save({1: {"display_name": "a"}, 2: {"display_name": "b"}})
+    table.save({2: {"display_name": "b"}})
+
+    assert open_store(tmp_path).participants.load() == {2: {"display_name": "b"}}
+
+
+def test_upsert_and_delete(tmp_path):
+    store = open_store(tmp_path)
+    table = store.participants
+    table.load()
+
+    table.upsert(1, {"checked_in": False})
+    table.upsert(1, {"checked_in": True})
+    table.upsert(2, {"checked_in": False})
+    table.delete(2)
+
+    assert open_store(tmp_path).participants.load() == {1: {"checked_in": True}}
+
+
+def test_tournoi_dates_round_trip(tmp_path):
+    store = open_store(tmp_path)
+    store.tournoi.load()
+    début = datetime.datetime(2020, 7, 4, 20, 30)
+
+    store.tournoi.save({"name": "Weekly", "début_tournoi": début})
+
+    assert open_store(tmp_path).tournoi.load() == {"name": "Weekly", "début_tournoi": début}
+
+
+def test_is_empty_until_json_is_imported(tmp_path):
+    (tmp_path / "tournoi.json").write_text(json.dumps({"name": "Weekly"}))
+    (tmp_path / "participants.json").write_text(json.dumps({"1": {"display_name": "a"}}))
+
+    store = open_store(tmp_path)
+    assert store.is_empty()
+
+    store.import_json(str(tmp_path / "tournoi.json"), str(tmp_path / "participants.json"), str(tmp_path / "missing.json"))
+    assert not store.is_empty()
+    assert store.participants.load() == {1: {"display_name": "a"}}
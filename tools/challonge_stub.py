@@ -0,0 +1,559 @@
+### Local stand-in for the Challonge v1 API, to run ATOS offline
+# python3 -m tools.challonge_stub [--port 8080] [--latency 0.2] [--error-rate 0.05] [--rate 5 --burst 20]
+# then set 'api_url: http://127.0.0.1:8080/v1' in the challonge section of config.yml
+#
+# Only the endpoints used by ATOS are implemented, with a real double elimination bracket.
+import argparse, asyncio, datetime, itertools, logging, random, re, time
+from aiohttp import web
+
+log = logging.getLogger("challonge_stub")
+
+BYE = "bye" # empty seed, never shown in the API
+
+
+def now():
+    return datetime.datetime.now(datetime.timezone.utc).astimezone().isoformat()
+
+class StubError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+### Double elimination bracket
+class Match:
+
+    def __init__(self, match_id, round, position):
+        self.id = match_id
+        self.round = round # > 0 : winner bracket, < 0 : looser bracket
+        self.position = position # index inside the round
+        self.slots = [None, None] # participant id, BYE, or None while unknown
+        self.sources = [None, None] # (match, is_loser) feeding each slot
+        self.winner_to = None # (match, slot)
+        self.loser_to = None
+        self.state = "pending"
+        self.winner = None
+        self.loser = None
+        self.scores_csv = ""
+        self.underway_at = None
+        self.completed_at = None
+        self.forfeited = False
+        self.visible = True # matches with a bye don't exist for Challonge
+        self.suggested_play_order = None
+
+    def order_key(self):
+        if self.round > 0:
+            return (2 * (self.round - 1), 0, self.position)
+        return (-self.round, 1, self.position)
+
+    def feeder(self, slot):
+        """Visible match the player of this slot comes from, going through matches with a bye."""
+        source = self.sources[slot]
+        while source is not None and not source[0].visible:
+            hidden, is_loser = source
+            players = [i for i in (0, 1) if hidden.slots[i] != BYE]
+            if is_loser or len(players) != 1: return None # the loser of a match with a bye is a bye
+            source = hidden.sources[players[0]]
+        return source
+
+    def data(self, tournament_id):
+        player = lambda slot: self.slots[slot] if self.slots[slot] != BYE else None
+        prereq = lambda slot: self.feeder(slot)[0].id if self.feeder(slot) else None
+        is_loser = lambda slot: bool(self.feeder(slot) and self.feeder(slot)[1])
+        return {"match": {
+            "id": self.id,
+            "tournament_id": tournament_id,
+            "state": self.state,
+            "player1_id": player(0),
+            "player2_id": player(1),
+            "player1_prereq_match_id": prereq(0),
+            "player2_prereq_match_id": prereq(1),
+            "player1_is_prereq_match_loser": is_loser(0),
+            "player2_is_prereq_match_loser": is_loser(1),
+            "winner_id": self.winner if self.winner != BYE else None,
+            "loser_id": self.loser if self.loser != BYE else None,
+            "round": self.round,
+            "identifier": str(self.suggested_play_order),
+            "suggested_play_order": self.suggested_play_order,
+            "scores_csv": self.scores_csv,
+            "forfeited": self.forfeited,
+            "underway_at": self.underway_at,
+            "completed_at": self.completed_at
+        }}
+
+
+def seed_positions(size):
+    positions = [1, 2]
+    while len(positions) < size: # 1 vs 4, 2 vs 3, then 1 vs 8, 4 vs 5...
+        positions = [x for seed in positions for x in (seed, 2 * len(positions) + 1 - seed)]
+    return positions[:size]
+
+def link(source, is_loser, destination, slot):
+    if is_loser:
+        source.loser_to = (destination, slot)
+    else:
+        source.winner_to = (destination, slot)
+    destination.sources[slot] = (source, is_loser)
+
+
+class Tournament:
+
+    def __init__(self, stub, tournament_id, params):
+        self.stub = stub
+        self.id = tournament_id
+        self.name = params.get("name", f"Tournament {tournament_id}")
+        self.url = params.get("url") or str(tournament_id)
+        self.tournament_type = params.get("tournament_type", "single elimination")
+        self.description = params.get("description", "")
+        self.game_name = params.get("game_name", "")
+        self.signup_cap = int(params["signup_cap"]) if params.get("signup_cap") else None
+        self.start_at = params.get("start_at")
+        self.state = "pending"
+        self.started_at = None
+        self.completed_at = None
+        self.participants = {} # id -> participant
+        self.matches = [] # build order : sources always come before their destinations
+        self.grand_final = None
+        self.grand_final_reset = None
+
+    def data(self):
+        return {"tournament": {
+            "id": self.id,
+            "name": self.name,
+            "url": self.url,
+            "full_challonge_url": f"https://challonge.com/{self.url}",
+            "tournament_type": self.tournament_type,
+            "description": self.description,
+            "game_name": self.game_name,
+            "signup_cap": self.signup_cap,
+            "state": self.state,
+            "start_at": self.start_at,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "participants_count": len(self.participants)
+        }}
+
+    ### Participants
+    def add_participant(self, name):
+        if self.state != "pending":
+            raise StubError(422, "Participants can't be added once the tournament has started")
+        if self.signup_cap and len(self.participants) >= self.signup_cap:
+            raise StubError(422, "The tournament is full")
+        if any(p["name"] == name for p in self.participants.values()):
+            raise StubError(422, "Name has already been taken")
+        participant = {
+            "id": self.stub.next_id(),
+            "tournament_id": self.id,
+            "name": name,
+            "display_name": name,
+            "seed": len(self.participants) + 1,
+            "active": True,
+            "final_rank": None,
+            "checked_in": False,
+            "created_at": now()
+        }
+        self.participants[participant["id"]] = participant
+        return participant
+
+    def remove_participant(self, participant_id):
+        participant = self.get_participant(participant_id)
+        participant_id = participant["id"]
+
+        if self.state == "pending": # seeds are filled in again
+            del self.participants[participant_id]
+            for seed, p in enumerate(sorted(self.participants.values(), key=lambda p: p["seed"]), 1):
+                p["seed"] = seed
+
+        elif participant["active"]: # remaining matches are forfeited
+            participant["active"] = False
+            for match in self.matches:
+                if match.state == "open" and participant_id in match.slots:
+                    self.forfeit(match, participant_id)
+
+        return participant
+
+    def get_participant(self, participant_id):
+        try:
+            return self.participants[int(participant_id)]
+        except (KeyError, ValueError):
+            raise StubError(404, "Participant not found")
+
+    ### Bracket
+    def start(self):
+        if self.state != "pending":
+            raise StubError(422, "The tournament has already started")
+        if len(self.participants) < 2:
+            raise StubError(422, "At least 2 participants are needed")
+
+        self.build_bracket()
+        self.state = "underway"
+        self.started_at = now()
+
+        for match in self.matches: # byes of the first round
+            if None not in match.slots and match.state == "pending":
+                self.ready(match)
+
+        self.number_matches()
+
+    def build_bracket(self):
+        players = [p["id"] for p in sorted(self.participants.values(), key=lambda p: p["seed"])]
+        size = 2
+        while size < len(players): size *= 2
+        rounds = size.bit_length() - 1
+
+        new_match = lambda round, position: Match(self.stub.next_id(), round, position)
+
+        winners = [[new_match(r, i) for i in range(size >> r)] for r in range(1, rounds + 1)]
+        for i, seed in enumerate(seed_positions(size)):
+            winners[0][i // 2].slots[i % 2] = players[seed - 1] if seed <= len(players) else BYE
+        for r in range(rounds - 1):
+            for i, match in enumerate(winners[r]):
+                link(match, False, winners[r + 1][i // 2], i % 2)
+
+        loosers = []
+        if rounds > 1:
+            loosers.append([new_match(-1, i) for i in range(size // 4)])
+            for i, match in enumerate(loosers[0]):
+                link(winners[0][2 * i], True, match, 0)
+                link(winners[0][2 * i + 1], True, match, 1)
+
+            for k in range(1, rounds):
+                # Losers of the winner round k+1 drop in, in reverse order every other round to avoid rematches
+                previous = loosers[-1]
+                drop_in = [new_match(-2 * k, i) for i in range(len(previous))]
+                for i, match in enumerate(drop_in):
+                    link(previous[i], False, match, 0)
+                    link(winners[k][len(drop_in) - 1 - i if k % 2 else i], True, match, 1)
+                loosers.append(drop_in)
+
+                if len(drop_in) > 1:
+                    next_round = [new_match(-2 * k - 1, i) for i in range(len(drop_in) // 2)]
+                    for i, match in enumerate(next_round):
+                        link(drop_in[2 * i], False, match, 0)
+                        link(drop_in[2 * i + 1], False, match, 1)
+                    loosers.append(next_round)
+
+        self.grand_final = new_match(rounds + 1, 0)
+        self.grand_final_reset = new_match(rounds + 1, 1)
+        link(winners[-1][0], False, self.grand_final, 0)
+        if loosers:
+            link(loosers[-1][0], False, self.grand_final, 1)
+        else:
+            link(winners[-1][0], True, self.grand_final, 1)
+
+        self.matches = [m for r in winners for m in r] + [m for r in loosers for m in r] + [self.grand_final, self.grand_final_reset]
+
+    def number_matches(self):
+        # A match with a bye, or fed by the loser of a match with a bye, is never shown
+        for match in self.matches:
+            match.visible = BYE not in match.slots and not any(s and s[1] and not s[0].visible for s in match.sources)
+        self.grand_final_reset.visible = False # only if needed
+
+        for play_order, match in enumerate(sorted([m for m in self.matches if m.visible], key=Match.order_key), 1):
+            match.suggested_play_order = play_order
+        self.grand_final_reset.suggested_play_order = self.grand_final.suggested_play_order + 1
+
+    def fill(self, destination, value):
+        if destination is None: return
+        match, slot = destination
+        match.slots[slot] = value
+        if None not in match.slots:
+            self.ready(match)
+
+    def ready(self, match):
+        if BYE in match.slots:
+            winner = match.slots[1] if match.slots[0] == BYE else match.slots[0]
+            self.complete(match, winner, BYE)
+            return
+
+        match.state = "open"
+        for player in match.slots:
+            if not self.participants[player]["active"]:
+                self.forfeit(match, player)
+                return
+
+    def forfeit(self, match, player):
+        winner = match.slots[1] if match.slots[0] == player else match.slots[0]
+        match.forfeited = True
+        self.complete(match, winner, player)
+
+    def complete(self, match, winner, loser):
+        match.state = "complete"
+        match.winner, match.loser = winner, loser
+        match.completed_at = now()
+
+        if match is self.grand_final:
+            if winner == match.slots[1]: # the looser bracket champion won : bracket reset
+                self.grand_final_reset.visible = True
+                self.grand_final_reset.slots = list(match.slots)
+                self.ready(self.grand_final_reset)
+            return
+
+        self.fill(match.winner_to, winner)
+        self.fill(match.loser_to, loser)
+
+    def report(self, match_id, params):
+        match = self.get_match(match_id)
+
+        if "scores_csv" in params:
+            if not re.match(r"^-?\d+--?\d+(,-?\d+--?\d+)*$", params["scores_csv"]):
+                raise StubError(422, "Scores are invalid")
+
+        if "winner_id" not in params:
+            if match.state == "pending":
+                raise StubError(422, "The match isn't open")
+            match.scores_csv = params.get("scores_csv", match.scores_csv)
+            return match
+
+        winner = int(params["winner_id"]) if str(params["winner_id"]).isdigit() else None
+        if winner not in match.slots:
+            raise StubError(422, "Winner must be one of the match participants")
+
+        if match.state == "complete":
+            if winner != match.winner:
+                raise StubError(422, "The match must be reopened to change its winner")
+            match.scores_csv = params.get("scores_csv", match.scores_csv)
+            return match
+
+        if match.state != "open":
+            raise StubError(422, "The match isn't open")
+
+        match.scores_csv = params.get("scores_csv", match.scores_csv)
+        loser = match.slots[1] if match.slots[0] == winner else match.slots[0]
+        self.complete(match, winner, loser)
+        return match
+
+    def mark_as_underway(self, match_id):
+        match = self.get_match(match_id)
+        if match.state != "open":
+            raise StubError(422, "The match isn't open")
+        match.underway_at = match.underway_at or now()
+        return match
+
+    def unmark_as_underway(self, match_id):
+        match = self.get_match(match_id)
+        if match.state != "open":
+            raise StubError(422, "The match isn't open")
+        match.underway_at = None
+        return match
+
+    def get_match(self, match_id):
+        for match in self.matches:
+            if str(match.id) == str(match_id) and match.visible:
+                return match
+        raise StubError(404, "Match not found")
+
+    def visible_matches(self, states=None, participant_id=None):
+        matches = sorted([m for m in self.matches if m.visible], key=lambda m: m.suggested_play_order)
+        if states and "all" not in states:
+            matches = [m for m in matches if m.state in states]
+        if participant_id is not None:
+            matches = [m for m in matches if int(participant_id) in m.slots]
+        return matches
+
+    def finalize(self):
+        if self.state != "underway":
+            raise StubError(422, "The tournament isn't underway")
+        if any(m.state != "complete" for m in self.visible_matches()):
+            raise StubError(422, "All matches must be complete")
+
+        # Eliminated later is ranked better, eliminated in the same round shares the rank
+        final = self.grand_final_reset if self.grand_final_reset.visible else self.grand_final
+        eliminated = {} # looser bracket round -> players
+        for match in self.matches[:-2]:
+            if match.loser_to is None and match.loser not in (None, BYE):
+                eliminated.setdefault(match.round, []).append(match.loser)
+        eliminations = [[final.winner], [final.loser]] + [eliminated[r] for r in sorted(eliminated)]
+
+        rank = 1
+        for players in eliminations:
+            for player in players:
+                self.participants[player]["final_rank"] = rank
+            rank += len(players)
+
+        self.state = "complete"
+        self.completed_at = now()
+
+
+### HTTP server
+def nested_params(query, prefix):
+    """'tournament[name]=x' -> {'name': 'x'}, 'participants[][name]=a&...' -> [{'name': 'a'}, ...]"""
+    values, items = {}, []
+    for key, value in query.items():
+        bulk = re.match(rf"^{re.escape(prefix)}\[\]\[(\w+)\]$", key)
+        single = re.match(rf"^{re.escape(prefix)}\[(\w+)\]$", key)
+        if bulk:
+            field = bulk.group(1)
+            if not items or field in items[-1]: items.append({})
+            items[-1][field] = value
+        elif single:
+            values[single.group(1)] = value
+    return items if items else values
+
+
+class ChallongeStub:
+
+    def __init__(self, latency=0, error_rate=0, rate=None, burst=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate = rate
+        self.burst = burst or rate
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.ids = itertools.count(1000)
+        self.tournaments = {}
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0}
+
+    def next_id(self):
+        return next(self.ids)
+
+    def get_tournament(self, url_or_id):
+        for tournament in self.tournaments.values():
+            if str(tournament.id) == url_or_id or tournament.url == url_or_id:
+                return tournament
+        raise StubError(404, "Tournament not found")
+
+    def throttled(self):
+        if not self.rate: return False
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1: return True
+        self.tokens -= 1
+        return False
+
+    @web.middleware
+    async def middleware(self, request, handler):
+        if request.path == "/stats":
+            return await handler(request)
+
+        self.stats["requests"] += 1
+
+        if "Authorization" not in request.headers:
+            return web.json_response({"errors": ["Unauthorized"]}, status=401)
+
+        if self.throttled():
+            self.stats["throttled"] += 1
+            log.info(f"429 {request.method} {request.path}")
+            return web.json_response({"errors": ["Rate limit exceeded"]}, status=429, headers={"Retry-After": str(max(1, round(1 / self.rate)))})
+
+        if self.latency:
+            await asyncio.sleep(random.uniform(0, 2 * self.latency)) # average latency
+
+        if random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            status = random.choice([502, 503, 504])
+            log.info(f"{status} {request.method} {request.path} (injected)")
+            return web.Response(status=status)
+
+        try:
+            return await handler(request)
+        except StubError as e:
+            return web.json_response({"errors": [str(e)]}, status=e.status)
+
+    ### Tournaments
+    async def create_tournament(self, request):
+        params = nested_params(request.query, "tournament")
+        if not params.get("name"):
+            raise StubError(422, "Name can't be blank")
+        if params.get("url") and any(t.url == params["url"] for t in self.tournaments.values()):
+            raise StubError(422, "URL is already taken")
+        tournament = Tournament(self, self.next_id(), params)
+        self.tournaments[tournament.id] = tournament
+        return web.json_response(tournament.data())
+
+    async def show_tournament(self, request):
+        return web.json_response(self.get_tournament(request.match_info["tournament"]).data())
+
+    async def start_tournament(self, request):
+        tournament = self.get_tournament(request.match_info["tournament"])
+        tournament.start()
+        return web.json_response(tournament.data())
+
+    async def finalize_tournament(self, request):
+        tournament = self.get_tournament(request.match_info["tournament"])
+        tournament.finalize()
+        return web.json_response(tournament.data())
+
+    ### Participants
+    async def index_participants(self, request):
+        tournament = self.get_tournament(request.match_info["tournament"])
+        return web.json_response([{"participant": p} for p in sorted(tournament.participants.values(), key=lambda p: p["seed"])])
+
+    async def create_participant(self, request):
+        tournament = self.get_tournament(request.match_info["tournament"])
+        params = nested_params(request.query, "participant")
+        if not params.get("name"):
+            raise StubError(422, "Name can't be blank")
+        return web.json_response({"participant": tournament.add_participant(params["name"])})
+
+    async def bulk_add_participants(self, request):
+        tournament = self.get_tournament(request.match_info["tournament"])
+        items = nested_params(request.query, "participants")
+        if not isinstance(items, list):
+            raise StubError(422, "No participants given")
+        return web.json_response([{"participant": tournament.add_participant(item["name"])} for item in items])
+
+    async def destroy_participant(self, request):
+        tournament = self.get_tournament(request.match_info["tournament"])
+        return web.json_response({"participant": tournament.remove_participant(request.match_info["participant"])})
+
+    ### Matches
+    async def index_matches(self, request):
+        tournament = self.get_tournament(request.match_info["tournament"])
+        states = request.query.getall("state[]", []) or request.query.getall("state", [])
+        matches = tournament.visible_matches(states, request.query.get("participant_id"))
+        return web.json_response([match.data(tournament.id) for match in matches])
+
+    async def update_match(self, request):
+        tournament = self.get_tournament(request.match_info["tournament"])
+        match = tournament.report(request.match_info["match"], nested_params(request.query, "match"))
+        return web.json_response(match.data(tournament.id))
+
+    async def mark_as_underway(self, request):
+        tournament = self.get_tournament(request.match_info["tournament"])
+        match = tournament.mark_as_underway(request.match_info["match"])
+        return web.json_response(match.data(tournament.id))
+
+    async def unmark_as_underway(self, request):
+        tournament = self.get_tournament(request.match_info["tournament"])
+        match = tournament.unmark_as_underway(request.match_info["match"])
+        return web.json_response(match.data(tournament.id))
+
+    async def show_stats(self, request):
+        return web.json_response(self.stats)
+
+    def app(self):
+        app = web.Application(middlewares=[self.middleware])
+        app.add_routes([
+            web.post("/v1/tournaments.json", self.create_tournament),
+            web.get("/v1/tournaments/{tournament}.json", self.show_tournament),
+            web.post("/v1/tournaments/{tournament}/start.json", self.start_tournament),
+            web.post("/v1/tournaments/{tournament}/finalize.json", self.finalize_tournament),
+            web.get("/v1/tournaments/{tournament}/participants.json", self.index_participants),
+            web.post("/v1/tournaments/{tournament}/participants.json", self.create_participant),
+            web.post("/v1/tournaments/{tournament}/participants/bulk_add.json", self.bulk_add_participants),
+            web.delete("/v1/tournaments/{tournament}/participants/{participant}.json", self.destroy_participant),
+            web.get("/v1/tournaments/{tournament}/matches.json", self.index_matches),
+            web.put("/v1/tournaments/{tournament}/matches/{match}.json", self.update_match),
+            web.post("/v1/tournaments/{tournament}/matches/{match}/mark_as_underway.json", self.mark_as_underway),
+            web.post("/v1/tournaments/{tournament}/matches/{match}/unmark_as_underway.json", self.unmark_as_underway),
+            web.get("/stats", self.show_stats)
+        ])
+        return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local stand-in for the Challonge v1 API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0, help="average latency, in seconds")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of requests answered with a 502/503/504")
+    parser.add_argument("--rate", type=float, default=None, help="requests per second before answering 429")
+    parser.add_argument("--burst", type=int, default=None, help="requests allowed at once")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stub = ChallongeStub(args.latency, args.error_rate, args.rate, args.burst)
+    web.run_app(stub.app(), host=args.host, port=args.port)
@@ -0,0 +1,53 @@
+### Activity in the set channels, fed by on_message instead of reading the channels' history
+
+
+class ActivityTracker:
+    """Last message time of each set channel, and of each author in it.
+
+    Times are naive UTC, like `discord.Message.created_at`. A channel is
+    `tracked` when everything said in it went through `record` (new set,
+    or whole history read once after a restart).
+    """
+
+    def __init__(self):
+        self.last_message = {} # channel id -> time
+        self.authors = {} # channel id -> {author id -> time}
+        self.tracked = set()
+
+    def start(self, channel_id):
+        self.forget(channel_id)
+        self.tracked.add(channel_id)
+
+    def forget(self, channel_id):
+        self.last_message.pop(channel_id, None)
+        self.authors.pop(channel_id, None)
+        self.tracked.discard(channel_id)
+
+    def clear(self):
+        self.last_message.clear()
+        self.authors.clear()
+        self.tracked.clear()
+
+    def record(self, message):
+        channel_id, time = message.channel.id, message.created_at
+        if time > self.last_message.get(channel_id, time.min):
+            self.last_message[channel_id] = time
+        authors = self.authors.setdefault(channel_id, {})
+        if time > authors.get(message.author.id, time.min):
+            authors[message.author.id] = time
+
+    async def backfill(self, channel, limit=None):
+        """Read the history of a channel we haven't been watching (after a restart)."""
+        async for message in channel.history(limit=limit):
+            self.record(message)
+        if limit == None: self.tracked.add(channel.id)
+
+    def has_spoken(self, channel_id, author_id):
+        return author_id in self.authors.get(channel_id, {})
+
+    def latest_authors(self, channel_id):
+        """[(author id, last message time)], most recent first."""
+        return sorted(self.authors.get(channel_id, {}).items(), key=lambda x: x[1], reverse=True)
+
+
+activity = ActivityTracker()
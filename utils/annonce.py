@@ -0,0 +1,71 @@
+### Registration announcement : message kept in cache, counter edits coalesced
+import asyncio, logging, time, discord
+
+from utils.get_config import annonce_edit_interval
+
+log = logging.getLogger("atos")
+
+
+class AnnonceUpdater:
+    """Edits the registration announcement at most once every `interval` seconds.
+
+    Each edit is done with the latest state, so a burst of registrations
+    only costs one or two edits. `flush` applies the pending one at once.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.message = None
+        self.task = None
+        self.wakeup = None
+        self.pending = False
+        self.last_edit = 0.0
+        self.requests, self.edits = 0, 0
+
+    def clear(self):
+        self.message = None
+        self.pending = False
+        if self.task and not self.task.done(): self.task.cancel()
+
+    def cache(self, message):
+        self.message = message
+
+    async def get(self, channel, message_id):
+        if self.message == None or self.message.id != message_id:
+            self.message = await channel.fetch_message(message_id)
+        return self.message
+
+    def schedule(self, edit):
+        self.requests += 1
+        self.pending = True
+        if self.wakeup == None: self.wakeup = asyncio.Event()
+        if self.task == None or self.task.done():
+            self.task = asyncio.ensure_future(self.run(edit))
+
+    async def run(self, edit):
+        while self.pending:
+            delay = self.last_edit + self.interval - time.monotonic()
+            if delay > 0 and not self.wakeup.is_set():
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            self.pending = False
+            try:
+                await edit()
+            except discord.HTTPException as e:
+                log.warning(f"Could not update the registration announcement : {e}")
+            self.last_edit = time.monotonic()
+            self.edits += 1
+
+    async def flush(self):
+        if self.task == None or self.task.done(): return
+        self.wakeup.set()
+        try:
+            await self.task
+        finally:
+            self.wakeup.clear()
+
+
+annonce_updater = AnnonceUpdater(annonce_edit_interval)
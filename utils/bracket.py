@@ -0,0 +1,172 @@
+### Bracket state between two polls of the open matches
+from typing import NamedTuple
+
+
+class MatchOpened(NamedTuple):
+    match: dict
+
+class MatchUnderway(NamedTuple):
+    match: dict
+
+class MatchUnmarked(NamedTuple):
+    match: dict # not underway anymore (unmarked on Challonge), to be launched again
+
+class MatchCompleted(NamedTuple):
+    match: dict # last known state, the match isn't open anymore
+
+class MatchReopened(NamedTuple):
+    match: dict
+
+
+class BracketSnapshot:
+    """Keep the previous poll of open matches and turn each new poll into events.
+
+    `waiting` (open, not underway yet) and `underway` are maintained from
+    the events, so the tick stages only get the matches they care about.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.matches = {} # match id -> match, open matches only
+        self.by_play_order = {}
+        self.waiting = {}
+        self.underway = {}
+        self.completed = {} # match id -> last known state
+        self.polls = 0
+
+    def update(self, bracket):
+        current = {match["id"]: match for match in bracket}
+        events = []
+
+        for match_id, match in current.items():
+            previous = self.matches.get(match_id)
+
+            if previous is None:
+                if self.completed.pop(match_id, None) is not None:
+                    events.append(MatchReopened(match))
+                else:
+                    events.append(MatchOpened(match))
+                if match["underway_at"] is not None:
+                    events.append(MatchUnderway(match))
+
+            elif previous["underway_at"] is None and match["underway_at"] is not None:
+                events.append(MatchUnderway(match))
+
+            elif previous["underway_at"] is not None and match["underway_at"] is None:
+                events.append(MatchUnmarked(match))
+
+        for match_id, match in self.matches.items():
+            if match_id not in current:
+                events.append(MatchCompleted(match))
+                self.completed[match_id] = match
+
+        self.matches = current
+        self.by_play_order = {match["suggested_play_order"]: match for match in bracket}
+
+        for event in events:
+            match_id = event.match["id"]
+            if isinstance(event, MatchCompleted):
+                self.waiting.pop(match_id, None)
+                self.underway.pop(match_id, None)
+            elif isinstance(event, MatchUnderway):
+                self.waiting.pop(match_id, None)
+                self.underway[match_id] = event.match
+            elif isinstance(event, MatchUnmarked):
+                self.underway.pop(match_id, None)
+                self.waiting[match_id] = event.match
+            elif event.match["underway_at"] is None: # opened or reopened
+                self.waiting[match_id] = event.match
+
+        # Latest state of the matches we track
+        self.waiting = {match_id: current[match_id] for match_id in self.waiting}
+        self.underway = {match_id: current[match_id] for match_id in self.underway}
+
+        self.polls += 1
+        return events
+
+    def is_open(self, suggested_play_order):
+        return suggested_play_order in self.by_play_order
+
+    def get(self, suggested_play_order):
+        return self.by_play_order.get(suggested_play_order)
+
+
+### Local model of the whole bracket : who goes where once a set is over
+class BracketModel:
+    """Every match of the bracket, kept up to date locally.
+
+    Destinations are the prerequisites read the other way around. Score
+    reports move the players forward right away, and each poll of the
+    open matches is the reference when both disagree.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.matches = {} # match id -> match
+        self.by_play_order = {}
+        self.winner_to = {} # match id -> (match id, slot)
+        self.loser_to = {}
+
+    def build(self, bracket):
+        self.clear()
+        for match in bracket:
+            self.add(dict(match))
+
+    def add(self, match):
+        self.matches[match["id"]] = match
+        self.by_play_order[match["suggested_play_order"]] = match
+        for slot in (1, 2):
+            prereq = match.get(f"player{slot}_prereq_match_id")
+            if prereq is not None:
+                destinations = self.loser_to if match.get(f"player{slot}_is_prereq_match_loser") else self.winner_to
+                destinations[prereq] = (match["id"], slot)
+
+    def report(self, match_id, winner_id):
+        match = self.matches.get(match_id)
+        if match is None or winner_id not in (match["player1_id"], match["player2_id"]): return
+
+        loser_id = match["player2_id"] if winner_id == match["player1_id"] else match["player1_id"]
+        match.update(state="complete", winner_id=winner_id, loser_id=loser_id)
+        self.advance(self.winner_to.get(match_id), winner_id)
+        self.advance(self.loser_to.get(match_id), loser_id)
+
+    def advance(self, destination, participant_id):
+        if destination is None: return
+        match_id, slot = destination
+        match = self.matches[match_id]
+        match[f"player{slot}_id"] = participant_id
+        if match["state"] == "pending" and match["player1_id"] is not None and match["player2_id"] is not None:
+            match["state"] = "open"
+
+    def reconcile(self, bracket):
+        """`bracket` holds every open match according to Challonge.
+
+        Returns True when the model can't tell what happened (set reported
+        or reopened from elsewhere) : the whole bracket has to be read again.
+        """
+        open_ids, stale = set(), False
+
+        for match in bracket:
+            open_ids.add(match["id"])
+            if match["id"] in self.matches:
+                stale = stale or self.matches[match["id"]]["state"] == "complete" # reopened
+                self.matches[match["id"]].update(match)
+            else: # e.g. the grand final reset
+                self.add(dict(match))
+
+        # Not open anymore : completed, or back to pending after a reopen upstream
+        return stale or any(match["state"] == "open" and match["id"] not in open_ids for match in self.matches.values())
+
+    def rounds(self):
+        return [match["round"] for match in self.matches.values()]
+
+    def get_active(self, suggested_play_order):
+        match = self.by_play_order.get(suggested_play_order)
+        return match if match is not None and match["state"] in ("open", "pending") else None
+
+    def not_underway(self):
+        return {match["suggested_play_order"] for match in self.matches.values() if match["state"] in ("open", "pending") and match["underway_at"] is None}
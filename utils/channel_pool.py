@@ -0,0 +1,118 @@
+### Pool of set channels : renamed and reused instead of created and deleted for every set
+import discord, time
+from collections import deque
+
+from utils.get_config import channel_pool_size
+
+POOL_NAME = "libre" # name of a free channel
+RENAME_LIMIT, RENAME_WINDOW = 2, 600 # Discord allows 2 renames per channel every 10 minutes
+PURGE_LIMIT = 200 # messages, a channel with more is deleted instead of emptied
+SIDES = ["winner bracket", "looser bracket"]
+
+
+class ChannelPool:
+    """Free set channels, per bracket category name.
+
+    A channel is only reused if it can still be renamed without hitting
+    Discord's rate limit, otherwise a new one is created (or the old one
+    deleted when released).
+    """
+
+    def __init__(self, size):
+        self.size = size # free channels kept per side
+        self.free = {side: deque() for side in SIDES}
+        self.renames = {} # channel id -> last rename times
+        self.loaded = False
+        self.stats = {"reused": 0, "released": 0, "deleted": 0}
+
+    def load(self, guild):
+        """Pick up the free channels left by a previous run."""
+        if self.loaded: return
+        for category in guild.categories:
+            if category.name.lower() in self.free:
+                for channel in category.text_channels:
+                    if channel.name == POOL_NAME and channel not in self.free[category.name.lower()]:
+                        self.free[category.name.lower()].append(channel)
+        self.loaded = True
+
+    def clear(self):
+        for free in self.free.values(): free.clear()
+        self.renames.clear()
+        self.loaded = False
+
+    def missing(self, side):
+        return max(0, self.size - len(self.free[side]))
+
+    def add(self, side, channel):
+        self.free[side].append(channel)
+
+    def can_rename(self, channel):
+        now = time.monotonic()
+        return sum(1 for t in self.renames.get(channel.id, ()) if now - t < RENAME_WINDOW) < RENAME_LIMIT
+
+    def renamed(self, channel):
+        self.renames.setdefault(channel.id, deque(maxlen=RENAME_LIMIT)).append(time.monotonic())
+
+    @staticmethod
+    def free_overwrites(guild):
+        return {guild.default_role: discord.PermissionOverwrite(read_messages=False)}
+
+    async def acquire(self, side, **settings):
+        """Turn a free channel into a set channel (name, overwrites...), None if none is available."""
+        free = self.free[side]
+
+        for _ in range(len(free)):
+            channel = free.popleft() # out of the pool while it's edited
+            if not self.can_rename(channel):
+                free.append(channel)
+                continue
+            try:
+                await channel.edit(**settings)
+            except discord.NotFound: # deleted by hand
+                continue
+            except discord.HTTPException:
+                free.append(channel)
+                raise
+            self.renamed(channel)
+            self.stats["reused"] += 1
+            return channel
+
+        return None
+
+    async def release(self, channel):
+        side = channel.category.name.lower() if channel.category else None
+
+        if side not in self.free or len(self.free[side]) >= self.size or not self.can_rename(channel):
+            await self.delete(channel)
+            return
+
+        try:
+            messages = await channel.history(limit=PURGE_LIMIT + 1).flatten()
+            if len(messages) > PURGE_LIMIT: # long set : not worth emptying
+                await self.delete(channel)
+                return
+            for x in range(0, len(messages), 100): # bulk delete takes 100 messages at most
+                await channel.delete_messages(messages[x:x+100])
+            await channel.edit(
+                name=POOL_NAME,
+                overwrites=self.free_overwrites(channel.guild),
+                topic="Channel libre, réutilisé pour un prochain set.",
+                reason="Set terminé, channel remis dans le pool"
+            )
+        except discord.NotFound:
+            raise
+        except discord.HTTPException: # half emptied or not renamed : can't be reused
+            await self.delete(channel)
+            return
+
+        self.renamed(channel)
+        self.free[side].append(channel)
+        self.stats["released"] += 1
+
+    async def delete(self, channel):
+        await channel.delete()
+        self.renames.pop(channel.id, None)
+        self.stats["deleted"] += 1
+
+
+channel_pool = ChannelPool(channel_pool_size)
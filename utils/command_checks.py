@@ -1,15 +1,16 @@
 ### Custom Discord commands checks
-import json
 from datetime import datetime
 from discord.ext import commands
 
 from utils.get_config import *
 from utils.json_hooks import dateconverter, dateparser, int_keys
+from utils.json_stream import get_tournoi
+from utils.stream import stream_manager
 
 # Is tournament pending?
 def tournament_is_pending(ctx):
     try:
-        with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+        tournoi = get_tournoi()
         return tournoi["statut"] == "pending"
     except (FileNotFoundError, TypeError, KeyError):
         return False
@@ -17,7 +18,7 @@ def tournament_is_pending(ctx):
 # Is tournament pending?
 def tournament_is_underway(ctx):
     try:
-        with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+        tournoi = get_tournoi()
         return tournoi["statut"] == "underway"
     except (FileNotFoundError, TypeError, KeyError):
         return False
@@ -25,7 +26,7 @@ def tournament_is_underway(ctx):
 # Is tournament pending?
 def tournament_is_underway_or_pending(ctx):
     try:
-        with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+        tournoi = get_tournoi()
         return tournoi["statut"] in ["underway", "pending"]
     except (FileNotFoundError, TypeError, KeyError):
         return False
@@ -33,7 +34,7 @@ def tournament_is_underway_or_pending(ctx):
 # Are inscriptions still open?
 def inscriptions_still_open(ctx):
     try:
-        with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+        tournoi = get_tournoi()
         return datetime.now() < tournoi["fin_inscription"]
     except (FileNotFoundError, TypeError, KeyError):
         return False
@@ -62,5 +63,4 @@ async def is_owner_or_to(ctx):
 
 # Is streaming?
 def is_streaming(ctx):
-    with open(stream_path, 'r+') as f: stream = json.load(f, object_pairs_hook=int_keys)
-    return ctx.author.id in stream
\ No newline at end of file
+    return ctx.author.id in stream_manager
\ No newline at end of file
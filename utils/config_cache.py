@@ -0,0 +1,55 @@
+### Parsed YAML configuration files, reloaded only when they change
+import os, yaml
+
+from utils.get_config import gamelist_path, preferences_path
+from utils.game_specs import parse_gamelist
+
+
+class YAMLCache:
+    """Parse a YAML file once, and again only when its mtime changes.
+
+    `parser` turns the raw YAML data into whatever the callers expect.
+    `hits` and `reloads` count how many times the cached value was
+    served and how many times the file had to be parsed.
+    """
+
+    def __init__(self, path, parser=None):
+        self.path = path
+        self.parser = parser
+        self.data = None
+        self.mtime = None
+        self.hits = 0
+        self.reloads = 0
+
+    def get(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self.mtime:
+            with open(self.path, 'r+') as f: data = yaml.full_load(f)
+            self.data = self.parser(data) if self.parser else data
+            self.mtime = mtime
+            self.reloads += 1
+        else:
+            self.hits += 1
+        return self.data
+
+    def dump(self, data):
+        with open(self.path, 'w') as f: yaml.dump(data, f)
+        self.data = self.parser(data) if self.parser else data
+        self.mtime = os.stat(self.path).st_mtime_ns
+        self.reloads += 1
+
+    def stats(self):
+        return {"hits": self.hits, "reloads": self.reloads}
+
+
+gamelist_cache = YAMLCache(gamelist_path, parser=parse_gamelist)
+preferences_cache = YAMLCache(preferences_path)
+
+def get_gamelist():
+    return gamelist_cache.get()
+
+def get_preferences():
+    return preferences_cache.get()
+
+def dump_preferences(preferences):
+    preferences_cache.dump(preferences)
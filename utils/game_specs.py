@@ -1,11 +1,52 @@
-import json
+import re
+from typing import NamedTuple, Optional
 
 from utils.get_config import *
-from utils.json_hooks import dateconverter, dateparser, int_keys
+from utils.json_stream import get_tournoi
+
+
+### Games from gamelist.yml
+class GameSpecs(NamedTuple):
+    ruleset: int
+    role: int
+    icon: str
+    emoji: Optional[str] # emoji name inside icon, used in the roles channel
+    ban_instruction: str
+    starters: list
+    counterpicks: list
+    role_1v1: Optional[int]
+    icon_1v1: Optional[str]
+    ranking: dict # league_name & league_id on braacket
+
+def parse_gamelist(gamelist):
+    games = {}
+
+    for game, specs in gamelist.items():
+        for key in ['ruleset', 'role', 'icon', 'ban_instruction', 'starters']:
+            if key not in specs:
+                raise ValueError(f"gamelist.yml : '{key}' is missing for {game}")
+
+        emoji = re.search(r'\:(.*?)\:', specs['icon'] or "")
+
+        games[game] = GameSpecs(
+            ruleset=specs['ruleset'],
+            role=specs['role'],
+            icon=specs['icon'],
+            emoji=emoji.group(1) if emoji else None,
+            ban_instruction=specs['ban_instruction'],
+            starters=specs['starters'] or [],
+            counterpicks=specs.get('counterpicks') or [],
+            role_1v1=specs.get('role_1v1'),
+            icon_1v1=specs.get('icon_1v1'),
+            ranking=specs.get('ranking') or {}
+        )
+
+    return games
+
 
 ### Accès stream
 def get_access_stream(access):
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     if tournoi['game'] == 'Project+':
         return f":white_small_square: **Accès host Dolphin Netplay** : `{access[0]}`"
@@ -13,6 +13,10 @@ gamelist_path                       = config["paths"]["gamelist"]
 auto_mode_path                      = config["paths"]["auto_mode"]
 ranking_path                        = config["paths"]["ranking"]
 preferences_path                    = config["paths"]["preferences"]
+database_path                       = config["paths"]["database"]
+
+### Storage backend
+storage_backend                     = config["system"]["storage"]
 
 ### Locale
 language                            = config["system"]["language"]
@@ -58,6 +62,37 @@ server_logo                         = config["discord"]["emojis"]["logo"]
 
 #### Challonge
 challonge_user                      = config["challonge"]["user"]
+challonge_api_url                   = config["challonge"]["api_url"]
+challonge_rate                      = config["challonge"]["rate"]
+challonge_burst                     = config["challonge"]["burst"]
+
+### Registrations
+annonce_edit_interval               = config["registration"]["edit_interval"]
+registration_batch_delay            = config["registration"]["batch_delay"]
+registration_workers                = config["registration"]["workers"]
+
+### Sets launching
+launch_concurrency                  = config["launch"]["concurrency"]
+launch_per_tick                     = config["launch"]["per_tick"]
+channel_pool_size                   = config["launch"]["channel_pool"]
+
+### Score reports
+score_workers                       = config["scores"]["workers"]
+
+### Outgoing Discord messages
+outbox_rate                         = config["outbox"]["rate"]
+outbox_burst                        = config["outbox"]["burst"]
+
+### Bracket polling
+poll_fast                           = config["polling"]["fast"]
+poll_normal                         = config["polling"]["normal"]
+poll_idle                           = config["polling"]["idle"]
+
+### HTTP connection pool
+http_limit                          = config["http"]["limit"]
+http_limit_per_host                 = config["http"]["limit_per_host"]
+http_keepalive_timeout              = config["http"]["keepalive_timeout"]
+http_timeout                        = config["http"]["timeout"]
 
 ### Tokens
 bot_secret                          = config["discord"]["secret"]
@@ -1,18 +1,230 @@
 # Retry operation if timeout
 # Also asynchronize operation
 import asyncio
+import aiohttp
+import logging
+import random
+import time
+import achallonge
+from collections import defaultdict
 from achallonge import ChallongeException
 
-async def async_http_retry(func, *args, **kwargs):
-    for retry in range(3):
+from utils.rate_limit import challonge_limiter, SCORE, WRITE, READ
+
+log = logging.getLogger("atos")
+
+READ_TTL = 5 # seconds a read result can be served again
+
+# Read-only calls, everything else is a write and invalidates the cached reads
+cached_reads = {achallonge.matches.index, achallonge.participants.index, achallonge.tournaments.show}
+
+### Retry policy
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 0.5 # seconds, doubled at each attempt
+BACKOFF_CAP = 8 # seconds, longest wait between two attempts (Retry-After included)
+RETRY_STATUSES = {429, 502, 503, 504} # the request most likely didn't go through
+RETRY_RATIO = 0.2 # retries allowed per request, per endpoint
+RETRY_BURST = 10 # retries allowed in a row before the ratio kicks in
+BREAKER_THRESHOLD = 5 # failed attempts in a row before failing fast
+BREAKER_COOLDOWN = 30 # seconds before trying again
+
+
+### Per-endpoint retry budget : retries are paid for by requests
+class RetryBudget:
+
+    def __init__(self):
+        self.tokens = RETRY_BURST
+
+    def deposit(self):
+        self.tokens = min(RETRY_BURST, self.tokens + RETRY_RATIO)
+
+    def withdraw(self):
+        if self.tokens < 1: return False
+        self.tokens -= 1
+        return True
+
+
+### Circuit breaker : stop sending requests while Challonge is down
+class CircuitBreaker:
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0 # in a row
+        self.opened_at = None
+        self.probe_at = None # half-open : a single request is let through
+        self.resume_at = 0 # Retry-After from a 429, for everyone
+        self.trips = 0
+
+    def allow(self):
+        if self.opened_at is None: return True
+        now = time.monotonic()
+        if now - self.opened_at < self.cooldown: return False
+        if self.probe_at is not None and now - self.probe_at < self.cooldown: return False
+        self.probe_at = now
+        return True
+
+    def success(self):
+        if self.opened_at is not None:
+            log.info("Challonge is reachable again, circuit breaker closed")
+        self.failures = 0
+        self.opened_at = self.probe_at = None
+
+    def failure(self):
+        self.failures += 1
+        if self.probe_at is not None or (self.opened_at is None and self.failures >= self.threshold):
+            if self.opened_at is None:
+                log.warning(f"Challonge failed {self.failures} times in a row, circuit breaker opened")
+                self.trips += 1
+            self.opened_at = time.monotonic()
+            self.probe_at = None
+
+    def hold(self, seconds):
+        self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+
+breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+retry_budgets = defaultdict(RetryBudget)
+retry_stats = defaultdict(lambda: {"attempts": 0, "successes": 0, "failures": 0, "retries": 0, "rejected": 0, "budget_exhausted": 0})
+
+def get_retry_stats():
+    return {"breaker_trips": breaker.trips, "breaker_open": breaker.opened_at is not None, "endpoints": {x: dict(y) for x, y in retry_stats.items()}}
+
+def backoff(attempt, retry_after=None):
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)) # full jitter
+    return max(delay, retry_after or 0)
+
+
+async def retry_request(func, *args, **kwargs):
+    priority = READ if func in cached_reads else SCORE if func == achallonge.matches.update else WRITE
+    endpoint = f"{func.__module__.split('.')[-1]}.{func.__name__}"
+    budget, stats = retry_budgets[endpoint], retry_stats[endpoint]
+    budget.deposit()
+
+    for attempt in range(MAX_ATTEMPTS):
+        # Someone got a 429 : wait with everyone else, unless it's too long
+        wait = breaker.resume_at - time.monotonic()
+        if wait > BACKOFF_CAP:
+            stats["rejected"] += 1
+            raise ChallongeException(f"Challonge rate limit, '{func.__name__}' not sent")
+        elif wait > 0:
+            await asyncio.sleep(wait)
+
+        # Before taking a token : a request the breaker rejects must not delay the others
+        if not breaker.allow():
+            stats["rejected"] += 1
+            raise ChallongeException(f"Challonge unavailable, '{func.__name__}' not sent")
+
+        await challonge_limiter.acquire(priority)
+
+        stats["attempts"] += 1
+        retry_after = None
+
         try:
-            return await func(*args, **kwargs)
+            result = await func(*args, **kwargs)
         except ChallongeException as e:
-            if "504" in str(e):
-                await asyncio.sleep(1+retry)
-            else:
+            status = getattr(e, "status", None)
+            if status not in RETRY_STATUSES:
+                if status is not None: breaker.success() # Challonge did answer
                 raise
-        except asyncio.exceptions.TimeoutError:
-            continue
-    else:
-        raise ChallongeException(f"Tried '{func.__name__}' several times without success")
\ No newline at end of file
+            if status == 429: # Challonge is up, only asking to slow down
+                breaker.success()
+                retry_after = e.retry_after
+                if retry_after: breaker.hold(retry_after)
+            else:
+                breaker.failure()
+        except (asyncio.exceptions.TimeoutError, aiohttp.ClientConnectionError):
+            breaker.failure()
+        else:
+            breaker.success()
+            stats["successes"] += 1
+            return result
+
+        stats["failures"] += 1
+
+        if attempt + 1 == MAX_ATTEMPTS: break
+
+        delay = backoff(attempt, retry_after)
+        if delay > BACKOFF_CAP: break
+
+        if not budget.withdraw():
+            stats["budget_exhausted"] += 1
+            break
+
+        stats["retries"] += 1
+        await asyncio.sleep(delay)
+
+    raise ChallongeException(f"Tried '{func.__name__}' several times without success")
+
+
+### Identical reads in flight share one request, results are kept for READ_TTL
+class ReadCoalescer:
+    """Each caller gets its own copy of the shared result (lists and their
+    dicts included), so a caller updating a match or a participant doesn't
+    change it for the others."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.generation = 0 # bumped by every write
+        self.results = {} # key -> (expiry, result)
+        self.inflight = {} # key -> task
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def invalidate(self):
+        self.generation += 1
+        self.results.clear()
+        self.inflight.clear() # reads started before the write are not shared anymore
+
+    async def get(self, key, fetch):
+        cached = self.results.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            return self.copy(cached[1])
+
+        task = self.inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(fetch())
+            self.inflight[key] = task
+            task.add_done_callback(lambda task, generation=self.generation: self.store(key, task, generation))
+
+        return self.copy(await asyncio.shield(task)) # one caller giving up doesn't cancel the others
+
+    @staticmethod
+    def copy(result):
+        if isinstance(result, list):
+            return [dict(item) if isinstance(item, dict) else item for item in result]
+        if isinstance(result, dict):
+            return dict(result)
+        return result
+
+    def store(self, key, task, generation):
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        # Don't keep a result that a write may have made outdated
+        if not task.cancelled() and task.exception() is None and generation == self.generation:
+            self.results[key] = (time.monotonic() + self.ttl, task.result())
+
+    def stats(self):
+        return {"hits": self.hits, "coalesced": self.coalesced, "misses": self.misses}
+
+
+read_cache = ReadCoalescer(READ_TTL)
+
+async def async_http_retry(func, *args, **kwargs):
+    if func in cached_reads:
+        key = (func, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError: # unhashable arguments, don't share
+            return await retry_request(func, *args, **kwargs)
+        return await read_cache.get(key, lambda: retry_request(func, *args, **kwargs))
+
+    try:
+        return await retry_request(func, *args, **kwargs)
+    finally:
+        read_cache.invalidate()
@@ -0,0 +1,83 @@
+### Shared HTTP session : one keep-alive connection pool for Challonge and braacket
+import aiohttp, logging
+import achallonge.api
+from collections import defaultdict
+from achallonge import ChallongeException
+
+from utils.get_config import challonge_api_url, http_limit, http_limit_per_host, http_keepalive_timeout, http_timeout
+
+log = logging.getLogger("atos")
+
+
+### Per-host connection reuse statistics
+connection_stats = defaultdict(lambda: {"requests": 0, "new": 0, "reused": 0})
+
+async def on_request_start(session, trace_config_ctx, params):
+    trace_config_ctx.host = params.url.host
+    connection_stats[params.url.host]["requests"] += 1
+
+async def on_connection_create_end(session, trace_config_ctx, params):
+    connection_stats[trace_config_ctx.host]["new"] += 1
+
+async def on_connection_reuseconn(session, trace_config_ctx, params):
+    connection_stats[trace_config_ctx.host]["reused"] += 1
+
+def get_connection_stats():
+    return {host: dict(stats) for host, stats in connection_stats.items()}
+
+
+### Session lifecycle : created on first use (inside the event loop), closed at shutdown
+session = None
+
+def get_session():
+    global session
+
+    if session is None or session.closed:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+
+        connector = aiohttp.TCPConnector(limit=http_limit, limit_per_host=http_limit_per_host, keepalive_timeout=http_keepalive_timeout)
+        session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=http_timeout), trace_configs=[trace_config])
+
+    return session
+
+async def close_session():
+    global session
+
+    if session is not None and not session.closed:
+        await session.close()
+        log.info(f"HTTP connections (per host) : {get_connection_stats()}")
+
+    session = None
+
+
+### Challonge error with the HTTP status, still a ChallongeException for the callers
+class ChallongeHTTPError(ChallongeException):
+
+    def __init__(self, status, reason, retry_after=None):
+        super().__init__(f"{status} {reason}")
+        self.status = status
+        self.retry_after = retry_after # seconds, from the Retry-After header
+
+def parse_retry_after(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError): # missing, or an HTTP date we don't bother with
+        return None
+
+
+### Replacement for achallonge.api.fetch, going through the shared session
+async def challonge_fetch(method, uri, params_prefix=None, loop=None, **params):
+    params = achallonge.api._prepare_params(params, params_prefix)
+    url = f"{challonge_api_url}/{uri}.json"
+    auth = aiohttp.BasicAuth(login=achallonge.api._credentials["user"], password=achallonge.api._credentials["api_key"])
+
+    async with get_session().request(method, url, params=params, auth=auth) as response:
+        if response.status >= 400:
+            raise ChallongeHTTPError(response.status, response.reason, parse_retry_after(response.headers.get("Retry-After")))
+        return await response.json()
+
+def use_shared_session():
+    achallonge.api.fetch = challonge_fetch # fetch_and_parse looks it up at call time
@@ -0,0 +1,135 @@
+### Append-only journal, used to persist participant changes between two snapshots
+import asyncio, hashlib, json, logging, os
+
+log = logging.getLogger("atos")
+
+COMMIT_DELAY = 0.05 # seconds during which appended records share a single fsync
+
+
+def snapshot_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+class Journal:
+    """Append-only file of compact JSON records, one per line.
+
+    The first line is a header holding the hash of the snapshot the
+    records apply to. After a compaction the header no longer matches,
+    so a journal that could not be reset (crash in between) is never
+    replayed twice on top of a snapshot that already contains it.
+
+    Records appended within COMMIT_DELAY are written together and share
+    a single fsync (group commit), run in the default executor so the
+    event loop never waits for the disk. `append` returns a future
+    resolved once the record is durable.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.count = 0
+        self.pending = None
+        self.generation = 0 # bumped by reset, fsyncs of a previous file are moot
+
+    def open(self, base):
+        """Return the records to replay on top of the snapshot `base`, then start appending."""
+        records = []
+
+        try:
+            with open(self.path, 'r') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            lines = []
+
+        header = self.decode(lines[0]) if lines else {}
+
+        if header == None: # torn write during a reset, nothing to replay
+            log.warning(f"Discarding {self.path}, its header can't be read")
+        elif header.get("base") == base:
+            for line in lines[1:]:
+                record = self.decode(line)
+                if record == None: # torn write at the end of the file
+                    log.warning(f"Ignoring a truncated record at the end of {self.path}")
+                    break
+                records.append(record)
+        elif len(lines) > 1:
+            log.warning(f"{self.path} does not match the current snapshot, its records are already part of it")
+
+        self.reset(base)
+
+        if records:
+            # Keep replayed records until the next compaction
+            self.file.write(''.join(self.encode(record) for record in records))
+            self.sync()
+            self.count = len(records)
+
+        return records
+
+    def encode(self, record):
+        return json.dumps(record, separators=(',', ':')) + '\n'
+
+    def decode(self, line):
+        """The record on this line, None if it can't be read."""
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        return record if isinstance(record, dict) else None
+
+    def append(self, record):
+        self.file.write(self.encode(record))
+        self.count += 1
+
+        if self.pending is None:
+            self.pending = asyncio.get_event_loop().create_future()
+            asyncio.get_event_loop().call_later(COMMIT_DELAY, self.commit)
+
+        return self.pending
+
+    def commit(self):
+        if self.pending is None: return
+        pending, self.pending = self.pending, None
+        try:
+            self.file.flush()
+            fsync = asyncio.get_event_loop().run_in_executor(None, os.fsync, self.file.fileno())
+        except OSError as e:
+            if not pending.done(): pending.set_exception(e)
+            return
+        generation = self.generation
+        fsync.add_done_callback(lambda done: self.committed(pending, done, generation))
+
+    def committed(self, pending, fsync, generation):
+        if pending.done(): return
+        if fsync.exception() is not None and generation == self.generation:
+            pending.set_exception(fsync.exception())
+        else: # durable, or part of the snapshot written by reset in the meantime
+            pending.set_result(None)
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def reset(self, base):
+        """Start an empty journal on top of a new snapshot."""
+        if self.file is not None:
+            self.file.close()
+
+        self.file = open(self.path, 'w')
+        self.file.write(self.encode({"base": base}))
+        self.sync()
+        self.count = 0
+        self.generation += 1
+
+        # Records waiting for their fsync are part of the new snapshot
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            if not pending.done(): pending.set_result(None)
+
+    def close(self):
+        if self.file is not None:
+            if self.pending is not None: # shutting down : wait for the disk here
+                pending, self.pending = self.pending, None
+                self.sync()
+                if not pending.done(): pending.set_result(None)
+            self.file.close()
+            self.file = None
@@ -1,10 +1,200 @@
-import json
-from utils.json_hooks import int_keys
-from utils.get_config import participants_path
+import json, os
+from utils.json_hooks import dateconverter, dateparser, int_keys
+from utils.journal import Journal, snapshot_hash
+from utils.get_config import participants_path, tournoi_path, stream_path, storage_backend, database_path
 
-with open(participants_path, 'r+') as f:
-    participants = json.load(f, object_pairs_hook=int_keys)
 
+### JSON storage : one file per document, rewritten in full
+class JSONFile:
+
+    def __init__(self, path, object_hook=None, object_pairs_hook=None):
+        self.path = path
+        self.object_hook = object_hook
+        self.object_pairs_hook = object_pairs_hook
+
+    def version(self):
+        return os.stat(self.path).st_mtime_ns # FileNotFoundError is up to the caller
+
+    def decode(self, raw):
+        return json.loads(raw, object_hook=self.object_hook, object_pairs_hook=self.object_pairs_hook)
+
+    def encode(self, data):
+        return json.dumps(data, indent=4, default=dateconverter).encode()
+
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def write(self, raw, durable=False):
+        if not durable:
+            with open(self.path, 'wb') as f: f.write(raw)
+            return
+
+        # Write aside then swap, so a crash never leaves a half-written file
+        with open(f"{self.path}.tmp", 'wb') as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def load(self):
+        return self.decode(self.read())
+
+    def save(self, data):
+        self.write(self.encode(data))
+
+
+### Storage backend, see 'storage' in config.yml
+if storage_backend == "sqlite":
+    from utils.sqlite_store import SQLiteStore
+
+    store = SQLiteStore(database_path)
+
+    if store.is_empty(): # First run with SQLite (or an interrupted one) : take over the existing JSON files
+        store.import_json(tournoi_path, participants_path, stream_path)
+
+    tournoi_table, participants_table, stream_table = store.tournoi, store.participants, store.stream
+    participants_journal = None # every change is already a transaction
+
+else:
+    tournoi_table = JSONFile(tournoi_path, object_hook=dateparser)
+    participants_table = JSONFile(participants_path, object_pairs_hook=int_keys)
+    stream_table = JSONFile(stream_path, object_pairs_hook=int_keys)
+    participants_journal = Journal(f"{participants_path}.journal")
+
+
+### Participants : snapshot + journal of changes since the snapshot
+def apply_participant_record(record):
+    if record["op"] == "in":
+        participants[record["id"]] = record["data"]
+    elif record["op"] == "out":
+        participants.pop(record["id"], None)
+    elif record["op"] == "check_in" and record["id"] in participants:
+        participants[record["id"]]["checked_in"] = True
+
+if participants_journal is None:
+    participants = participants_table.load()
+else:
+    raw = participants_table.read()
+    participants = participants_table.decode(raw)
+    for record in participants_journal.open(snapshot_hash(raw)):
+        apply_participant_record(record)
+
+# Persist one change ('in', 'out' or 'check_in'), return once it is durable
+async def commit_participant(op, discord_id):
+    if participants_journal is None:
+        if op == "out":
+            participants_table.delete(discord_id)
+        else:
+            participants_table.upsert(discord_id, participants[discord_id])
+        return
+
+    record = {"op": op, "id": discord_id}
+    if op == "in": record["data"] = participants[discord_id]
+    await participants_journal.append(record)
+
+# Full snapshot, which also empties the journal
 def dump_participants():
-    with open(participants_path, 'w') as f:
-        json.dump(participants, f, indent=4)
\ No newline at end of file
+    if participants_journal is None:
+        participants_table.save(participants)
+    else:
+        raw = participants_table.encode(participants)
+        participants_table.write(raw, durable=True)
+        participants_journal.reset(snapshot_hash(raw))
+
+def compact_participants():
+    if participants_journal is not None and participants_journal.count > 0:
+        dump_participants()
+
+def reset_participants():
+    participants.clear()
+    participants_index.rebuild()
+    dump_participants()
+
+
+### Reverse lookups : Challonge id -> Discord id, display name -> Discord id
+class ParticipantsIndex:
+    """Discord id -> Challonge id/display name is `participants` itself, this keeps the other way around."""
+
+    def __init__(self):
+        self.by_challonge = {}
+        self.by_name = {} # display name -> Discord ids in registration order, names are not unique
+
+    def add(self, discord_id):
+        homonyms = self.by_name.setdefault(participants[discord_id]["display_name"], [])
+        if discord_id not in homonyms: homonyms.append(discord_id)
+        if "challonge" in participants[discord_id]:
+            self.by_challonge[participants[discord_id]["challonge"]] = discord_id
+
+    def remove(self, discord_id):
+        try:
+            homonyms = self.by_name.get(participants[discord_id]["display_name"], [])
+            if discord_id in homonyms: homonyms.remove(discord_id)
+            if not homonyms: self.by_name.pop(participants[discord_id]["display_name"], None)
+            self.by_challonge.pop(participants[discord_id].get("challonge"), None)
+        except KeyError:
+            pass
+
+    def rebuild(self):
+        self.by_challonge.clear()
+        self.by_name.clear()
+        for discord_id in participants:
+            self.add(discord_id)
+
+    def discord_id(self, challonge_id):
+        return self.by_challonge.get(challonge_id)
+
+    def discord_id_by_name(self, display_name):
+        """First participant registered with that name, homonyms not yet on Challonge first."""
+        homonyms = self.by_name.get(display_name, [])
+        for discord_id in homonyms:
+            if "challonge" not in participants[discord_id]:
+                return discord_id
+        return homonyms[0] if homonyms else None
+
+    def display_name(self, challonge_id, default=None):
+        try:
+            return participants[self.by_challonge[challonge_id]]["display_name"]
+        except KeyError:
+            return default
+
+
+participants_index = ParticipantsIndex()
+participants_index.rebuild()
+
+
+### Process-wide copy of tournoi.json
+class TournamentState:
+    """Keep the tournament data in memory instead of parsing it on every call.
+
+    The data is only read again when the storage reports a new version
+    (file mtime, or an external commit with SQLite), so manual edits are
+    still picked up. Every write goes through `dump`.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.data = {}
+        self.version = None
+
+    def load(self):
+        version = self.table.version()
+        if version != self.version:
+            self.data = self.table.load()
+            self.version = version
+        return self.data
+
+    def dump(self, tournoi=None):
+        if tournoi is not None:
+            self.data = tournoi
+        self.table.save(self.data)
+        self.version = self.table.version()
+
+
+tournoi_state = TournamentState(tournoi_table)
+
+def get_tournoi():
+    return tournoi_state.load()
+
+def dump_tournoi(tournoi=None):
+    tournoi_state.dump(tournoi)
@@ -0,0 +1,102 @@
+### Outbox : messages queued per channel, merged and sent in the background
+import asyncio, logging, time, discord
+from collections import deque
+
+from cogs.utils.chat_formatting import pagify
+from utils.rate_limit import RateLimiter
+from utils.get_config import outbox_rate, outbox_burst
+
+log = logging.getLogger("atos")
+
+PAGE_LENGTH = 2000 # Discord's limit per message
+
+
+class Outbox:
+    """Producers don't wait for Discord : `send` queues the text and returns.
+
+    One sender per channel merges what is pending into pages of at most
+    2000 characters, in order, and sends them at `rate` messages per
+    second (up to `burst` at once), Discord's rate limit being per channel.
+    The parts given to one `send` stay on the same page, unless they don't
+    fit in a page by themselves.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.pending = {} # channel id -> deque of (text, queued at)
+        self.senders = {} # channel id -> task
+        self.limiters = {} # channel id -> RateLimiter
+        self.queued, self.delivered = 0, 0 # calls to `send`, and those merged into sent pages
+        self.sent, self.failed = 0, 0 # pages
+        self.latency, self.max_latency = 0.0, 0.0 # seconds between queueing and sending
+
+    def send(self, channel, *parts):
+        content = "\n".join(part.strip("\n") for part in parts if part.strip() != "")
+        if channel == None or content == "": return
+        self.pending.setdefault(channel.id, deque()).append((content, time.monotonic()))
+        self.queued += 1
+        if channel.id not in self.senders or self.senders[channel.id].done():
+            self.senders[channel.id] = asyncio.ensure_future(self.sender(channel))
+
+    async def sender(self, channel):
+        pending = self.pending[channel.id]
+        limiter = self.limiters.setdefault(channel.id, RateLimiter(self.rate, self.burst))
+
+        while pending:
+            await limiter.acquire() # whatever is queued while waiting goes in the same page
+            batch = list(pending)
+            pending.clear()
+
+            pages = self.paginate([content for content, _ in batch])
+
+            for i, page in enumerate(pages):
+                if i > 0: await limiter.acquire()
+                try:
+                    await channel.send(page)
+                except discord.HTTPException as e:
+                    self.failed += 1
+                    log.warning(f"Could not send a message to #{channel} : {e}")
+                else:
+                    self.sent += 1
+
+            now = time.monotonic()
+            self.delivered += len(batch)
+            for _, queued_at in batch:
+                self.latency += now - queued_at
+                self.max_latency = max(self.max_latency, now - queued_at)
+
+            log.debug(f"Outbox #{channel} : {len(batch)} messages sent in {len(pages)} pages, queued for {now - batch[0][1]:.1f}s at most")
+
+    @staticmethod
+    def paginate(contents):
+        """Fill pages with whole messages, only a message too long by itself is split."""
+        pages = []
+
+        for content in contents:
+            if pages and len(pages[-1]) + 1 + len(content) <= PAGE_LENGTH:
+                pages[-1] += "\n" + content
+            elif len(content) <= PAGE_LENGTH:
+                pages.append(content)
+            else:
+                pages.extend(pagify(content, delims=["\n\n", "\n"], priority=True, escape_mass_mentions=False, page_length=PAGE_LENGTH))
+
+        return pages
+
+    async def flush(self):
+        """Wait for everything queued so far to be sent."""
+        senders = [task for task in self.senders.values() if not task.done()]
+        if senders: await asyncio.wait(senders)
+
+    def stats(self):
+        return {
+            "queued": self.queued - self.delivered,
+            "delivered": self.delivered,
+            "sent": self.sent,
+            "failed": self.failed,
+            "avg_latency": round(self.latency / self.delivered, 3) if self.delivered else 0.0,
+            "max_latency": round(self.max_latency, 3)
+        }
+
+
+outbox = Outbox(outbox_rate, outbox_burst)
@@ -0,0 +1,50 @@
+### How often the bracket is polled while the tournament is underway
+from utils.get_config import poll_fast, poll_normal, poll_idle
+
+FAST_POLLS = 3 # fast polls after some activity
+IDLE_AFTER = 5 # polls without anything new before slowing down
+OUT_OF_BAND_DELAY = 2 # seconds, lets a few reports in a row share one poll
+
+
+class AdaptivePolling:
+    """Fast right after score reports or new sets, slower when nothing happens.
+
+    `pending` asks for a poll as soon as the current one is over.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.interval = poll_normal
+        self.fast_polls = 0
+        self.quiet_polls = 0
+        self.reports = 0 # since the last poll
+        self.running = False
+        self.pending = False
+
+    def report(self):
+        self.reports += 1
+        self.fast_polls = FAST_POLLS
+
+    def next_interval(self, events, backlog=False):
+        if events or self.reports or backlog:
+            self.quiet_polls = 0
+            if events or backlog: self.fast_polls = FAST_POLLS
+        else:
+            self.quiet_polls += 1
+
+        self.reports = 0
+
+        if self.fast_polls > 0:
+            self.fast_polls -= 1
+            self.interval = poll_fast
+        elif self.quiet_polls >= IDLE_AFTER:
+            self.interval = poll_idle
+        else:
+            self.interval = poll_normal
+
+        return self.interval
+
+
+polling = AdaptivePolling()
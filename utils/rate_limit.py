@@ -0,0 +1,88 @@
+### Token bucket shared by every Challonge request, served by priority
+import asyncio, heapq, itertools, time
+
+from utils.get_config import challonge_rate, challonge_burst
+
+# Priority classes, lowest first
+SCORE = 0 # score reports
+WRITE = 1 # other writes (launching matches, DQ, announcements...)
+READ = 2
+
+PRIORITY_NAMES = {SCORE: "score", WRITE: "write", READ: "read"}
+
+
+class RateLimiter:
+    """`rate` requests per second on average, up to `burst` at once.
+
+    When no token is left, callers queue and are served by priority
+    class, then in arrival order.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.waiters = [] # heap of (priority, arrival, future)
+        self.arrival = itertools.count()
+        self.wakeup = None
+        self.depth = {priority: 0 for priority in PRIORITY_NAMES}
+        self.max_depth = {priority: 0 for priority in PRIORITY_NAMES}
+        self.waited = {priority: 0 for priority in PRIORITY_NAMES}
+        self.wait_time = {priority: 0.0 for priority in PRIORITY_NAMES}
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, priority=READ):
+        self.refill()
+
+        if not self.waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return
+
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.arrival), future))
+        self.depth[priority] += 1
+        self.max_depth[priority] = max(self.max_depth[priority], self.depth[priority])
+        self.waited[priority] += 1
+        start = time.monotonic()
+        self.schedule()
+
+        try:
+            await future
+        finally:
+            self.depth[priority] -= 1
+            self.wait_time[priority] += time.monotonic() - start
+
+    def schedule(self):
+        if self.wakeup is None and self.waiters:
+            delay = max(0, (1 - self.tokens) / self.rate)
+            self.wakeup = asyncio.get_event_loop().call_later(delay, self.release)
+
+    def release(self):
+        self.wakeup = None
+        self.refill()
+
+        while self.waiters and self.tokens >= 1:
+            priority, arrival, future = heapq.heappop(self.waiters)
+            if future.done(): continue # caller gave up
+            self.tokens -= 1
+            future.set_result(None)
+
+        self.schedule()
+
+    def stats(self):
+        return {
+            PRIORITY_NAMES[priority]: {
+                "queued": self.depth[priority],
+                "max_queued": self.max_depth[priority],
+                "waited": self.waited[priority],
+                "wait_time": round(self.wait_time[priority], 3)
+            } for priority in PRIORITY_NAMES
+        }
+
+
+challonge_limiter = RateLimiter(challonge_rate, challonge_burst)
@@ -0,0 +1,86 @@
+### Registrations by reaction : applied in batches, roles and DMs in the background
+import asyncio, datetime, logging
+
+from utils.get_config import registration_batch_delay, registration_workers
+
+log = logging.getLogger("atos")
+
+
+class RegistrationQueue:
+    """✅ added/removed on the announcement, handed to `process` every `delay` seconds.
+
+    Only the last change of each member is kept, so a quick add/remove
+    costs nothing. Each change comes with the time it was received, to be
+    judged against the end of the registrations rather than the time the
+    batch runs. `background` runs role changes and DMs, `workers` at a
+    time, without holding up the next batch. Once `close`d (end of the
+    registrations), changes are ignored and `flush` applies the pending
+    ones at once.
+    """
+
+    def __init__(self, delay, workers):
+        self.delay = delay
+        self.workers = workers
+        self.changes = {} # member id -> (member, "in" or "out", received at), first come first served
+        self.task = None
+        self.wakeup = None
+        self.semaphore = None
+        self.closed = False
+        self.received, self.batches, self.jobs = 0, 0, 0
+
+    def push(self, member, op, process):
+        if member == None or self.closed: return # left the server, or too late
+        self.changes[member.id] = (member, op, datetime.datetime.now())
+        self.received += 1
+        if self.wakeup == None: self.wakeup = asyncio.Event()
+        if self.task == None or self.task.done():
+            self.task = asyncio.ensure_future(self.run(process))
+
+    async def run(self, process):
+        while self.changes:
+            if not self.wakeup.is_set():
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.delay) # let the burst pile up
+                except asyncio.TimeoutError:
+                    pass
+            batch = list(self.changes.values())
+            self.changes.clear()
+            self.batches += 1
+            try:
+                await process(batch)
+            except Exception as e:
+                log.error("Error while processing registrations", exc_info=e)
+
+    def close(self):
+        self.closed = True
+
+    async def flush(self):
+        if self.task == None or self.task.done(): return
+        self.wakeup.set()
+        try:
+            await self.task
+        finally:
+            self.wakeup.clear()
+
+    def clear(self):
+        self.closed = False # ready for the next tournament
+        self.changes.clear()
+        if self.task != None and not self.task.done(): self.task.cancel()
+
+    def background(self, job):
+        if self.semaphore == None: self.semaphore = asyncio.Semaphore(self.workers)
+        self.jobs += 1
+        asyncio.ensure_future(self.bounded(job))
+
+    async def bounded(self, job):
+        async with self.semaphore:
+            try:
+                await job
+            except Exception as e:
+                log.warning(f"Registration side effect failed : {e}")
+
+    def stats(self):
+        return {"pending": len(self.changes), "received": self.received, "batches": self.batches, "jobs": self.jobs}
+
+
+registrations = RegistrationQueue(registration_batch_delay, registration_workers)
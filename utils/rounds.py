@@ -1,47 +1,86 @@
-import json
+from types import MappingProxyType
+from typing import NamedTuple, Optional
 
 from utils.get_config import *
-from utils.json_hooks import dateconverter, dateparser, int_keys
+from utils.json_stream import get_tournoi
 
-### Determine whether a match is top 8 or not
-def is_top8(match_round):
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
-    return (match_round >= tournoi["round_winner_top8"]) or (match_round <= tournoi["round_looser_top8"])
 
-### Determine whether a match is top 8 or not
-def is_bo5(match_round):
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+class RoundInfo(NamedTuple):
+    name: Optional[str]
+    top8: bool
+    bo5: bool
+
+
+### Compute everything about a round from the thresholds set by calculate_top8
+def compute_round_info(tournoi, match_round):
+    max_round_winner = tournoi["round_winner_top8"] + 2
+    max_round_looser = tournoi["round_looser_top8"] - 3
+
+    top8 = (match_round >= tournoi["round_winner_top8"]) or (match_round <= tournoi["round_looser_top8"])
+
     if tournoi["full_bo3"]:
-        return False
+        bo5 = False
     elif tournoi["full_bo5"]:
-        return True
+        bo5 = True
     else:
-        return (match_round >= tournoi["round_winner_bo5"]) or (match_round <= tournoi["round_looser_bo5"])
+        bo5 = (match_round >= tournoi["round_winner_bo5"]) or (match_round <= tournoi["round_looser_bo5"])
 
-### Retourner nom du round
-def nom_round(match_round):
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
-    max_round_winner = tournoi["round_winner_top8"] + 2
-    max_round_looser = tournoi["round_looser_top8"] - 3
+    name = None
 
     if match_round > 0:
         if match_round == max_round_winner:
-            return "Grand Final"
+            name = "Grand Final"
         elif match_round == max_round_winner - 1:
-            return "Winners Final"
+            name = "Winners Final"
         elif match_round == max_round_winner - 2:
-            return "Winners Semi-Final"
+            name = "Winners Semi-Final"
         elif match_round == max_round_winner - 3:
-            return "Winners Quarter-Final"
+            name = "Winners Quarter-Final"
         else:
-            return f"Winners Round {match_round}"
+            name = f"Winners Round {match_round}"
 
     elif match_round < 0:
         if match_round == max_round_looser:
-            return "Losers Final"
+            name = "Losers Final"
         elif match_round == max_round_looser + 1:
-            return "Losers Semi-Final"
+            name = "Losers Semi-Final"
         elif match_round == max_round_looser + 2:
-            return "Losers Quarter-Final"
+            name = "Losers Quarter-Final"
         else:
-            return f"Losers Round {-match_round}"
+            name = f"Losers Round {-match_round}"
+
+    return RoundInfo(name, top8, bo5)
+
+
+### Precompute the table once the bracket is known, it's stored with the tournament
+def build_round_table(tournoi, rounds):
+    tournoi["rounds"] = {str(match_round): list(compute_round_info(tournoi, match_round)) for match_round in sorted(set(rounds))}
+
+
+_round_table = {"source": None, "table": MappingProxyType({})}
+
+def get_round_table():
+    source = get_tournoi().get("rounds")
+    if source is not _round_table["source"]: # tournament (re)loaded or table rebuilt
+        _round_table["table"] = MappingProxyType({int(k): RoundInfo(*v) for k, v in (source or {}).items()})
+        _round_table["source"] = source
+    return _round_table["table"]
+
+def round_info(match_round):
+    try:
+        return get_round_table()[match_round]
+    except KeyError: # not in the bracket when it started, or table not built yet
+        return compute_round_info(get_tournoi(), match_round)
+
+
+### Determine whether a match is top 8 or not
+def is_top8(match_round):
+    return round_info(match_round).top8
+
+### Determine whether a match is BO5 or not
+def is_bo5(match_round):
+    return round_info(match_round).bo5
+
+### Retourner nom du round
+def nom_round(match_round):
+    return round_info(match_round).name
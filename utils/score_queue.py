@@ -0,0 +1,66 @@
+### Score reports : processed by a pool of workers, one at a time per set
+import asyncio, logging
+
+from utils.get_config import score_workers
+
+log = logging.getLogger("atos")
+
+
+class ScoreQueue:
+    """Reports are queued and handled by `workers` tasks in parallel.
+
+    `lock(match_id)` serializes the reports of a single set, so the same
+    set is never updated twice at once. `clear` stops the workers and
+    drops the reports still queued, at the end of a tournament.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.queue = None
+        self.tasks = []
+        self.locks = {} # match id -> asyncio.Lock
+        self.processed = 0
+
+    def start(self):
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+        self.tasks = [task for task in self.tasks if not task.done()]
+        while len(self.tasks) < self.workers:
+            self.tasks.append(asyncio.ensure_future(self.worker(self.queue)))
+
+    async def worker(self, queue):
+        while True:
+            job, on_error = await queue.get()
+            try:
+                await job
+            except Exception as e:
+                log.error("Error while processing a score report", exc_info=e)
+                await on_error()
+            finally:
+                self.processed += 1
+                queue.task_done()
+
+    def submit(self, job, on_error):
+        self.start()
+        self.queue.put_nowait((job, on_error))
+
+    def lock(self, match_id):
+        if match_id not in self.locks:
+            self.locks[match_id] = asyncio.Lock()
+        return self.locks[match_id]
+
+    def clear(self):
+        for task in self.tasks: task.cancel()
+        self.tasks = []
+        if self.queue is not None:
+            while not self.queue.empty(): # reports of the previous tournament, never processed
+                job, _ = self.queue.get_nowait()
+                job.close()
+            self.queue = None
+        self.locks.clear()
+
+    def stats(self):
+        return {"queued": self.queue.qsize() if self.queue else 0, "processed": self.processed, "workers": len(self.tasks)}
+
+
+score_queue = ScoreQueue(score_workers)
@@ -1,5 +1,4 @@
 import asyncio
-import aiohttp
 import aiofiles, aiofiles.os
 import json
 import achallonge
@@ -9,33 +8,36 @@ from filecmp import cmp
 from pathlib import Path
 
 from utils.http_retry import async_http_retry
+from utils.http_session import get_session
 from utils.get_config import *
 from utils.json_hooks import dateconverter, dateparser, int_keys
+from utils.json_stream import get_tournoi, participants_index
+from utils.config_cache import get_gamelist
 
 
 async def get_ranking_csv(tournoi):
-    with open(gamelist_path, 'r+') as f: gamelist = yaml.full_load(f)
+    gamelist = get_gamelist()
 
-    async with aiohttp.ClientSession(headers={'Connection': 'close'}) as session:
+    session = get_session()
 
-        for page in range(1,6): # Retrieve up to 5*200 = 1000 entries (since max. CSV export is 200)
+    for page in range(1,6): # Retrieve up to 5*200 = 1000 entries (since max. CSV export is 200)
 
-            url = (f"https://braacket.com/league/{gamelist[tournoi['game']]['ranking']['league_name']}/ranking/"
-                f"{gamelist[tournoi['game']]['ranking']['league_id']}?rows=200&page={page}&export=csv")
+        url = (f"https://braacket.com/league/{gamelist[tournoi['game']].ranking['league_name']}/ranking/"
+            f"{gamelist[tournoi['game']].ranking['league_id']}?rows=200&page={page}&export=csv")
 
-            async with session.get(url) as resp:
-                if int(resp.status) >= 400:
-                    raise ValueError("Ranking not found/accessible")
-                async with aiofiles.open(f'{ranking_path}_{page}', mode='wb') as f:
-                    await f.write(await resp.read())
+        async with session.get(url) as resp:
+            if int(resp.status) >= 400:
+                raise ValueError("Ranking not found/accessible")
+            async with aiofiles.open(f'{ranking_path}_{page}', mode='wb') as f:
+                await f.write(await resp.read())
 
-            if page != 1 and cmp(f'{ranking_path}_{page}', f'{ranking_path}_{page-1}'):
-                await aiofiles.os.remove(f'{ranking_path}_{page}')
-                break
+        if page != 1 and cmp(f'{ranking_path}_{page}', f'{ranking_path}_{page-1}'):
+            await aiofiles.os.remove(f'{ranking_path}_{page}')
+            break
 
 
 async def seed_participants(participants):
-    with open(tournoi_path, 'r+') as f: tournoi = json.load(f, object_hook=dateparser)
+    tournoi = get_tournoi()
 
     ranking = {}
 
@@ -71,7 +73,7 @@ async def seed_participants(participants):
         )
 
         for inscrit in challonge_participants:
-            for joueur in participants:
-                if inscrit['name'] == participants[joueur]['display_name']:
-                    participants[joueur]['challonge'] = inscrit['id']
-                    break
\ No newline at end of file
+            joueur = participants_index.discord_id_by_name(inscrit['name'])
+            if joueur is not None:
+                participants[joueur]['challonge'] = inscrit['id']
+                participants_index.add(joueur)
\ No newline at end of file
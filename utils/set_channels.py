@@ -0,0 +1,49 @@
+### Channel of each set, by suggested play order : no need to look for it by name among all the guild's channels
+from utils.channel_pool import SIDES
+
+
+class SetChannels:
+    """Play order -> (channel id, category id) of the sets' channels.
+
+    Filled when a set is launched, emptied when its channel is released,
+    and rebuilt from the bracket categories after a restart (`load`).
+    """
+
+    def __init__(self):
+        self.channels = {} # play order -> (channel id, category id)
+        self.loaded = False
+
+    def load(self, guild):
+        if self.loaded: return
+        for category in guild.categories:
+            if category.name.lower() in SIDES:
+                for channel in category.text_channels:
+                    if channel.name.isdigit(): # channel names are suggested play orders, free channels are skipped
+                        self.channels.setdefault(int(channel.name), (channel.id, category.id))
+        self.loaded = True
+
+    def clear(self):
+        self.channels.clear()
+        self.loaded = False
+
+    def add(self, play_order, channel):
+        self.channels[play_order] = (channel.id, channel.category_id)
+
+    def remove(self, play_order):
+        self.channels.pop(play_order, None)
+
+    def get(self, guild, play_order):
+        """The channel of a set, None if there is none (or it was deleted by hand)."""
+        try:
+            channel_id, _ = self.channels[play_order]
+        except KeyError:
+            return None
+        channel = guild.get_channel(channel_id)
+        if channel == None: self.remove(play_order)
+        return channel
+
+    def play_orders(self):
+        return list(self.channels)
+
+
+set_channels = SetChannels()
@@ -0,0 +1,101 @@
+### Optional SQLite storage for tournoi, participants and stream data
+### Usage to import existing JSON files : python3 -m utils.sqlite_store
+import json, sqlite3
+
+from utils.json_hooks import dateconverter, dateparser, int_keys
+
+
+class SQLiteTable:
+    """A JSON document (top-level mapping) stored with one row per key.
+
+    `save` compares the new mapping against what was last read or written
+    and only upserts/deletes the rows that changed, in a single transaction.
+    """
+
+    def __init__(self, store, name, object_hook=None, object_pairs_hook=None):
+        self.store = store
+        self.name = name
+        self.object_hook = object_hook
+        self.object_pairs_hook = object_pairs_hook
+        self.rows = {} # key -> last persisted JSON text
+        store.conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (key PRIMARY KEY, value TEXT NOT NULL)")
+
+    def version(self):
+        return self.store.version()
+
+    def decode(self, text):
+        return json.loads(text, object_hook=self.object_hook, object_pairs_hook=self.object_pairs_hook)
+
+    def encode(self, value):
+        return json.dumps(value, default=dateconverter)
+
+    def load(self):
+        self.rows = dict(self.store.conn.execute(f"SELECT key, value FROM {self.name}"))
+        data = {key: self.decode(text) for key, text in self.rows.items()}
+        return self.object_hook(data) if self.object_hook else data
+
+    def save(self, data):
+        encoded = {key: self.encode(value) for key, value in data.items()}
+        upserts = [(key, text) for key, text in encoded.items() if self.rows.get(key) != text]
+        deletes = [(key,) for key in self.rows if key not in encoded]
+
+        if upserts or deletes:
+            with self.store.conn:
+                self.store.conn.executemany(f"INSERT OR REPLACE INTO {self.name} (key, value) VALUES (?, ?)", upserts)
+                self.store.conn.executemany(f"DELETE FROM {self.name} WHERE key = ?", deletes)
+
+        self.rows = encoded
+
+    def upsert(self, key, value):
+        text = self.encode(value)
+        with self.store.conn:
+            self.store.conn.execute(f"INSERT OR REPLACE INTO {self.name} (key, value) VALUES (?, ?)", (key, text))
+        self.rows[key] = text
+
+    def delete(self, key):
+        with self.store.conn:
+            self.store.conn.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+        self.rows.pop(key, None)
+
+
+class SQLiteStore:
+    """Single WAL-mode connection holding the tournoi, participants and stream tables."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        self.tournoi = SQLiteTable(self, "tournoi", object_hook=dateparser)
+        self.participants = SQLiteTable(self, "participants", object_pairs_hook=int_keys)
+        self.stream = SQLiteTable(self, "stream", object_pairs_hook=int_keys)
+        self.conn.commit()
+
+    def version(self):
+        # Only changes when another connection commits (manual edits, importer...)
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def is_empty(self):
+        return not any(self.conn.execute(f"SELECT 1 FROM {table.name} LIMIT 1").fetchone()
+                       for table in [self.tournoi, self.participants, self.stream])
+
+    def import_json(self, tournoi_path, participants_path, stream_path):
+        for table, path in [(self.tournoi, tournoi_path), (self.participants, participants_path), (self.stream, stream_path)]:
+            try:
+                with open(path, 'r+') as f: data = table.decode(f.read())
+            except FileNotFoundError:
+                continue
+            table.load()
+            table.save(data)
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == '__main__':
+    from utils.get_config import database_path, tournoi_path, participants_path, stream_path
+
+    store = SQLiteStore(database_path)
+    store.import_json(tournoi_path, participants_path, stream_path)
+    store.close()
+    print(f"JSON data imported into {database_path}")
@@ -1,12 +1,122 @@
-import json
+from collections import deque
 
 from utils.get_config import *
-from utils.json_hooks import int_keys
+from utils.json_stream import stream_table
+
+
+class StreamManager:
+    """Stream data kept in memory, with indexes for membership checks.
+
+    Each streamer has a deque of play orders. `queued` and `on_stream`
+    map a play order to the streamer holding it. Every mutation is
+    written through to the storage once.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.streams = {}
+        self.queued = {}
+        self.on_stream = {}
+        self.load()
+
+    def load(self):
+        self.streams = {}
+        for streamer, infos in self.table.load().items():
+            self.streams[streamer] = dict(infos, queue=deque(infos['queue']))
+        self.reindex()
+
+    def reindex(self):
+        self.queued = {order: streamer for streamer in self.streams for order in self.streams[streamer]['queue']}
+        self.on_stream = {self.streams[x]['on_stream']: x for x in self.streams if self.streams[x]['on_stream'] is not None}
+
+    def save(self):
+        self.table.save({streamer: dict(infos, queue=list(infos['queue'])) for streamer, infos in self.streams.items()})
+
+    def reset(self):
+        self.streams.clear()
+        self.reindex()
+        self.save()
+
+    def __contains__(self, streamer):
+        return streamer in self.streams
+
+    def __getitem__(self, streamer):
+        return self.streams[streamer]
+
+    def __len__(self):
+        return len(self.streams)
+
+    def __iter__(self):
+        return iter(self.streams)
+
+    def is_on_stream(self, suggested_play_order):
+        return suggested_play_order in self.on_stream
+
+    def is_queued(self, suggested_play_order):
+        return suggested_play_order in self.queued
+
+    def init_stream(self, streamer, channel):
+        self.stop_stream(streamer, save=False)
+        self.streams[streamer] = {
+            'channel': channel,
+            'access': ['N/A', 'N/A'],
+            'on_stream': None,
+            'queue': deque()
+        }
+        self.save()
+
+    def stop_stream(self, streamer, save=True):
+        infos = self.streams.pop(streamer, None)
+        if infos is None: return
+        for order in infos['queue']: self.queued.pop(order, None)
+        self.on_stream.pop(infos['on_stream'], None)
+        if save: self.save()
+
+    def set_access(self, streamer, access):
+        self.streams[streamer]['access'] = list(access)
+        self.save()
+
+    def add_to_queue(self, streamer, orders):
+        added = []
+        for order in orders:
+            if order not in self.queued:
+                self.streams[streamer]['queue'].append(order)
+                self.queued[order] = streamer
+                added.append(order)
+        if added: self.save()
+        return added
+
+    def remove_from_queue(self, streamer, orders):
+        orders = list(dict.fromkeys(orders))
+        if any(self.queued.get(order) != streamer for order in orders):
+            raise ValueError("Set not in the stream queue")
+        for order in orders:
+            self.streams[streamer]['queue'].remove(order)
+            self.queued.pop(order, None)
+        self.save()
+
+    def swap(self, streamer, order1, order2):
+        queue = self.streams[streamer]['queue']
+        x, y = queue.index(order1), queue.index(order2) # ValueError if not queued
+        queue[x], queue[y] = queue[y], queue[x]
+        self.save()
+
+    def set_on_stream(self, streamer, suggested_play_order):
+        self.on_stream.pop(self.streams[streamer]['on_stream'], None)
+        self.streams[streamer]['on_stream'] = suggested_play_order
+        self.on_stream[suggested_play_order] = streamer
+
+        while suggested_play_order in self.streams[streamer]['queue']:
+            self.streams[streamer]['queue'].remove(suggested_play_order)
+        self.queued.pop(suggested_play_order, None)
+
+        self.save()
+
+
+stream_manager = StreamManager(stream_table)
 
 def is_on_stream(suggested_play_order):
-    with open(stream_path, 'r+') as f: stream = json.load(f, object_pairs_hook=int_keys)
-    return suggested_play_order in [stream[x]['on_stream'] for x in stream]
+    return stream_manager.is_on_stream(suggested_play_order)
 
 def is_queued_for_stream(suggested_play_order):
-    with open(stream_path, 'r+') as f: stream = json.load(f, object_pairs_hook=int_keys)
-    return suggested_play_order in sum([stream[x]['queue'] for x in stream], [])
\ No newline at end of file
+    return stream_manager.is_queued(suggested_play_order)